@@ -6,8 +6,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.routers import crawler, jobs, tables
-from app.services.database import init_db
+from app.services.database import init_db, close_db
+from app.services.crawl_logger import start_log_writer, stop_log_writer
+from app.services.crawler import close_client
 from app.services.scheduler import scheduler_service
+from app.utils.responses import ORJSONFallbackResponse
 
 
 @asynccontextmanager
@@ -15,16 +18,21 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     await init_db()
+    start_log_writer()
     scheduler_service.start()
     yield
     # Shutdown
-    scheduler_service.shutdown()
+    await scheduler_service.shutdown()
+    await close_client()
+    await stop_log_writer()
+    await close_db()
 
 
 app = FastAPI(
     title="API Crawler",
     description="A system to analyze, crawl APIs and persist data in structured format",
     version="1.0.0",
+    default_response_class=ORJSONFallbackResponse,
     lifespan=lifespan
 )
 
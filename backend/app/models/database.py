@@ -1,7 +1,7 @@
 """
 SQLAlchemy Database Models
 """
-from sqlalchemy import Column, String, Integer, DateTime, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, DateTime, Text, Index, Enum as SQLEnum
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import enum
@@ -73,9 +73,13 @@ class Notification(Base):
 class CrawlLog(Base):
     """Store crawl job logs for live streaming"""
     __tablename__ = "crawl_logs"
+    __table_args__ = (
+        # Serves both get_logs queries (filter by job, ordered by id) without a sort
+        Index("ix_crawl_logs_job_id_id", "job_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    job_id = Column(String(36), nullable=False, index=True)
+    job_id = Column(String(36), nullable=False)
     level = Column(String(20), nullable=False)  # info, warning, error, success, debug
     message = Column(Text, nullable=False)
     details = Column(Text, nullable=True)  # JSON string for additional data
@@ -22,6 +22,7 @@ from app.services.crawler import (
 )
 from app.services.crawl_logger import get_logs, subscribe_to_logs, get_buffer_logs
 from app.services.scheduler import scheduler_service
+from app.utils.responses import ORJSONFallbackResponse
 
 
 router = APIRouter()
@@ -123,12 +124,24 @@ async def stream_job_logs(job_id: str):
     """
     async def event_generator():
         try:
-            async for log in subscribe_to_logs(job_id):
-                if log.get("type") == "keepalive":
-                    yield f": keepalive\n\n"
-                else:
-                    data = json.dumps(log)
-                    yield f"data: {data}\n\n"
+            async for batch in subscribe_to_logs(job_id):
+                # Coalesce back-to-back logs into a single frame; markers are sent
+                # where they were queued, between the logs before and after them
+                logs = []
+                for entry in batch:
+                    if "type" not in entry:
+                        logs.append(entry)
+                        continue
+                    if logs:
+                        yield _log_frame(logs)
+                        logs = []
+                    if entry["type"] == "lagged":
+                        # Client fell behind and missed logs - it should resync via /logs
+                        yield f"event: lagged\ndata: {json.dumps(entry)}\n\n"
+                    elif entry["type"] == "keepalive":
+                        yield f": keepalive\n\n"
+                if logs:
+                    yield _log_frame(logs)
         except asyncio.CancelledError:
             pass
     
@@ -143,10 +156,18 @@ async def stream_job_logs(job_id: str):
     )
 
 
+def _log_frame(logs: list) -> str:
+    """SSE frame for a run of logs: a plain message for one, a batch event for several"""
+    if len(logs) == 1:
+        return f"data: {json.dumps(logs[0])}\n\n"
+    return f"event: batch\ndata: {json.dumps({'batch': logs})}\n\n"
+
+
 @router.get("/jobs/{job_id}/logs/buffer")
 async def get_buffered_logs(job_id: str):
     """
     Get in-memory buffered logs for a job (fast, no DB query)
     """
+    # Buffer entries are already JSON-safe, so skip jsonable_encoder
     logs = get_buffer_logs(job_id)
-    return {"logs": logs, "job_id": job_id}
+    return ORJSONFallbackResponse({"logs": logs, "job_id": job_id})
@@ -1,23 +1,31 @@
 """
 Jobs API Router
 """
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import List, Optional
 
-from app.services.crawler import get_all_jobs, get_job_by_id, update_job_status
+from app.services.crawler import get_all_jobs, get_job_by_id, update_job_status, get_jobs_version
 from app.services.scheduler import scheduler_service
 from app.models.database import JobStatus
+from app.utils.http_cache import make_etag, not_modified
 
 
 router = APIRouter()
 
 
 @router.get("/")
-async def list_jobs():
+async def list_jobs(request: Request, response: Response, limit: Optional[int] = None, offset: int = 0):
     """
-    List all crawl jobs
+    List crawl jobs, newest first
     """
-    jobs = await get_all_jobs()
+    etag = make_etag(get_jobs_version())
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
+    jobs = await get_all_jobs(limit, offset)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     return jobs
 
 
@@ -44,7 +52,7 @@ async def pause_job(job_id: str):
     if job["status"] != "running":
         raise HTTPException(status_code=400, detail="Job is not running")
     
-    scheduler_service.cancel_job(job_id)
+    await scheduler_service.cancel_job(job_id)
     await update_job_status(job_id, JobStatus.PAUSED)
     
     return {"status": "paused", "job_id": job_id}
@@ -76,7 +84,7 @@ async def stop_job(job_id: str):
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    scheduler_service.cancel_job(job_id)
+    await scheduler_service.cancel_job(job_id)
     await update_job_status(job_id, JobStatus.COMPLETED, error_message="Manually stopped")
     
     return {"status": "stopped", "job_id": job_id}
@@ -1,21 +1,38 @@
 """
 Tables API Router
 """
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+import orjson
 
-from app.services.database import get_all_tables, get_table_info, get_table_data, table_exists
+from app.services.database import (
+    get_all_tables,
+    get_table_info,
+    get_table_data,
+    stream_table_data,
+    table_exists,
+    get_tables_version
+)
+from app.utils.http_cache import make_etag, not_modified
 
 
 router = APIRouter()
 
 
 @router.get("/")
-async def list_tables():
+async def list_tables(request: Request, response: Response):
     """
     List all crawled data tables
     """
+    etag = make_etag(get_tables_version())
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
     tables = await get_all_tables()
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     return tables
 
 
@@ -24,26 +41,42 @@ async def get_table(table_name: str):
     """
     Get information about a specific table
     """
-    if not await table_exists(table_name):
-        raise HTTPException(status_code=404, detail="Table not found")
-    
     table_info = await get_table_info(table_name)
+    if not table_info:
+        raise HTTPException(status_code=404, detail="Table not found")
     return table_info
 
 
 @router.get("/{table_name}/data")
-async def get_data(table_name: str, limit: int = 100, offset: int = 0):
+async def get_data(
+    request: Request,
+    table_name: str,
+    limit: int = 100,
+    offset: int = 0,
+    after_id: Optional[int] = None
+):
     """
     Get data from a table
+    Pass the previous page's next_after_id as after_id to page by _id instead of offset,
+    which stays fast deep into large tables
+    Clients sending Accept: application/x-ndjson get rows streamed one JSON object per line
     """
     if not await table_exists(table_name):
         raise HTTPException(status_code=404, detail="Table not found")
     
-    data = await get_table_data(table_name, limit, offset)
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        rows = stream_table_data(table_name, limit, offset, after_id)
+        return StreamingResponse(
+            (orjson.dumps(row, default=str) + b"\n" async for row in rows),
+            media_type="application/x-ndjson"
+        )
+    
+    data = await get_table_data(table_name, limit, offset, after_id)
     return {
         "table_name": table_name,
         "data": data,
         "limit": limit,
         "offset": offset,
-        "count": len(data)
+        "count": len(data),
+        "next_after_id": data[-1].get("_id") if data else None
     }
@@ -2,68 +2,233 @@
 Crawl Logger Service - Handles logging for crawl jobs
 Supports real-time streaming via Server-Sent Events
 """
+import os
 import json
 import asyncio
+import itertools
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional, AsyncGenerator
-from sqlalchemy import text
-from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple, AsyncGenerator
+from sqlalchemy import text, insert
+from collections import defaultdict, deque
 
+from app.models.database import CrawlLog
 from app.services.database import async_session
 
 # In-memory log buffer for real-time streaming
-# job_id -> list of recent logs
-_log_buffers: Dict[str, list] = defaultdict(list)
-_log_subscribers: Dict[str, list] = defaultdict(list)
+# job_id -> bounded deque of recent logs
 MAX_BUFFER_SIZE = 100
+_log_buffers: Dict[str, deque] = defaultdict(lambda: deque(maxlen=MAX_BUFFER_SIZE))
+_log_subscribers: Dict[str, list] = defaultdict(list)
+_lagged_queues: set = set()  # Subscriber queues holding a lagged marker not yet consumed
+_log_seq = itertools.count(1)  # Orders entries so subscribers can skip replayed logs
+MAX_SUBSCRIBER_QUEUE_SIZE = 500
+BUFFER_RETENTION_SECONDS = 300
+_buffer_cleanups: Dict[str, asyncio.TimerHandle] = {}
+MAX_STREAM_BATCH = 50
+KEEPALIVE_INTERVAL = 30.0
+
+# Pending log rows waiting to be persisted by the background writer
+_log_queue: asyncio.Queue = asyncio.Queue()
+_writer_task: Optional[asyncio.Task] = None
+MAX_WRITE_BATCH = 200
+
+# Levels written to crawl_logs - others only reach the buffer and live subscribers
+PERSIST_LEVELS = frozenset(
+    level.strip().lower()
+    for level in os.environ.get("CRAWLER_LOG_PERSIST_LEVELS", "info,success,warning,error").split(",")
+    if level.strip()
+)
+
+# Built once so SQLAlchemy can reuse the compiled form for every batch
+_INSERT_LOG = insert(CrawlLog)
+
+# Optional per-job token bucket for debug/info logs (CRAWLER_LOG_RATE_LIMIT logs/sec, 0 = off)
+LOG_RATE_PER_SECOND = float(os.environ.get("CRAWLER_LOG_RATE_LIMIT", "0"))
+LOG_RATE_CAPACITY = max(LOG_RATE_PER_SECOND * 2, 1.0)  # at least one token, even below 0.5/s
+RATE_LIMITED_LEVELS = frozenset({"debug", "info"})
+SUPPRESSION_REPORT_INTERVAL = 5.0
+_rate_state: Dict[str, Tuple[float, float]] = {}  # job_id -> (tokens, last_refill)
+_suppressed: Dict[str, int] = defaultdict(int)
+_reporter_task: Optional[asyncio.Task] = None
 
 
 async def add_log(
     job_id: str, 
     level: str, 
     message: str, 
-    details: Optional[Dict[str, Any]] = None
+    details: Optional[Dict[str, Any]] = None,
+    reactivate: bool = True
 ) -> None:
     """
     Add a log entry for a crawl job
+    reactivate=False is for bookkeeping messages that must not keep a finished
+    job's buffer alive (its pending cleanup stays scheduled)
     """
+    if LOG_RATE_PER_SECOND > 0 and level in RATE_LIMITED_LEVELS and not _take_token(job_id):
+        _suppressed[job_id] += 1
+        return
+    
+    now = datetime.utcnow()
     log_entry = {
         "job_id": job_id,
         "level": level,
         "message": message,
-        "details": json.dumps(details) if details else None,
-        "created_at": datetime.utcnow().isoformat(),
-        "timestamp": datetime.utcnow().timestamp()
+        "details": details or None,
+        "created_at": now.isoformat(),
+        "timestamp": now.timestamp(),
+        "seq": next(_log_seq)
     }
     
-    # Add to in-memory buffer for live streaming
-    _log_buffers[job_id].append(log_entry)
-    if len(_log_buffers[job_id]) > MAX_BUFFER_SIZE:
-        _log_buffers[job_id] = _log_buffers[job_id][-MAX_BUFFER_SIZE:]
+    if reactivate:
+        # Job is active again - keep its buffer
+        cleanup = _buffer_cleanups.pop(job_id, None)
+        if cleanup:
+            cleanup.cancel()
+    
+    # Add to in-memory buffer for live streaming (unless a finished job's buffer is already gone)
+    if reactivate or job_id in _log_buffers:
+        _log_buffers[job_id].append(log_entry)
     
     # Notify subscribers
     for queue in _log_subscribers.get(job_id, []):
-        try:
-            queue.put_nowait(log_entry)
-        except:
-            pass
+        _notify_subscriber(queue, log_entry)
     
-    # Persist to database
+    # Queue for the background writer
+    if level not in PERSIST_LEVELS:
+        return
+    _log_queue.put_nowait({
+        "job_id": job_id,
+        "level": level,
+        "message": message,
+        "details": json.dumps(details) if details else None,
+        "created_at": now
+    })
+
+
+def _take_token(job_id: str) -> bool:
+    """Refill the job's token bucket and try to take one token"""
+    now = time.monotonic()
+    tokens, last_refill = _rate_state.get(job_id, (LOG_RATE_CAPACITY, now))
+    tokens = min(LOG_RATE_CAPACITY, tokens + (now - last_refill) * LOG_RATE_PER_SECOND)
+    if tokens < 1:
+        _rate_state[job_id] = (tokens, now)
+        return False
+    _rate_state[job_id] = (tokens - 1, now)
+    return True
+
+
+async def _report_suppressed() -> None:
+    """Periodically log how many messages the rate limiter dropped per job"""
+    while True:
+        await asyncio.sleep(SUPPRESSION_REPORT_INTERVAL)
+        for job_id in list(_suppressed):
+            count = _suppressed.pop(job_id)
+            await add_log(
+                job_id, "warning",
+                f"Suppressed {count} log messages in the last {SUPPRESSION_REPORT_INTERVAL:.0f}s",
+                {"suppressed": count},
+                reactivate=False
+            )
+        
+        # Forget buckets that have refilled completely
+        now = time.monotonic()
+        for job_id, (tokens, last_refill) in list(_rate_state.items()):
+            if tokens + (now - last_refill) * LOG_RATE_PER_SECOND >= LOG_RATE_CAPACITY:
+                del _rate_state[job_id]
+
+
+def _notify_subscriber(queue: asyncio.Queue, log_entry: Dict[str, Any]) -> None:
+    """
+    Push a log entry to a subscriber queue
+    Slow consumers drop their oldest entries and get one lagged marker (until they
+    consume it) so they can resync from DB
+    """
+    if queue.full():
+        _drop_oldest(queue)
+        if queue not in _lagged_queues:
+            _drop_oldest(queue)
+            queue.put_nowait({
+                "type": "lagged",
+                "job_id": log_entry["job_id"],
+                "timestamp": log_entry["created_at"]
+            })
+            _lagged_queues.add(queue)
+    queue.put_nowait(log_entry)
+
+
+def _drop_oldest(queue: asyncio.Queue) -> None:
+    """Drop a subscriber queue's oldest entry, forgetting its lagged marker if that was it"""
+    try:
+        entry = queue.get_nowait()
+    except asyncio.QueueEmpty:
+        return
+    if entry.get("type") == "lagged":
+        _lagged_queues.discard(queue)
+
+
+async def _log_writer() -> None:
+    """
+    Background task that drains the log queue
+    Collects up to MAX_WRITE_BATCH pending rows and writes them with one executemany,
+    reusing a single session for every batch. A None entry stops the writer.
+    """
     async with async_session() as session:
-        await session.execute(
-            text("""
-                INSERT INTO crawl_logs (job_id, level, message, details, created_at)
-                VALUES (:job_id, :level, :message, :details, :created_at)
-            """),
-            {
-                "job_id": job_id,
-                "level": level,
-                "message": message,
-                "details": log_entry["details"],
-                "created_at": datetime.utcnow()
-            }
-        )
-        await session.commit()
+        while True:
+            batch = [await _log_queue.get()]
+            try:
+                while len(batch) < MAX_WRITE_BATCH:
+                    batch.append(_log_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                pass
+            
+            stopping = None in batch
+            if stopping:
+                batch = [row for row in batch if row is not None]
+            
+            if batch:
+                try:
+                    await session.execute(_INSERT_LOG, batch)
+                    await session.commit()
+                except Exception as e:
+                    await session.rollback()
+                    print(f"Error writing logs: {e}")
+            
+            if stopping:
+                return
+
+
+def start_log_writer() -> None:
+    """Start the background log writer (and the suppression reporter when rate limiting is on)"""
+    global _writer_task, _reporter_task
+    if _writer_task is None or _writer_task.done():
+        _writer_task = asyncio.create_task(_log_writer())
+    if LOG_RATE_PER_SECOND > 0 and (_reporter_task is None or _reporter_task.done()):
+        _reporter_task = asyncio.create_task(_report_suppressed())
+
+
+async def stop_log_writer() -> None:
+    """Stop the background log writer and flush any pending logs"""
+    global _writer_task, _reporter_task
+    if _reporter_task is not None:
+        _reporter_task.cancel()
+        _reporter_task = None
+    
+    if _writer_task is not None:
+        _log_queue.put_nowait(None)
+        await _writer_task
+        _writer_task = None
+    
+    # Logs queued after the writer stopped
+    batch = []
+    while not _log_queue.empty():
+        row = _log_queue.get_nowait()
+        if row is not None:
+            batch.append(row)
+    if batch:
+        async with async_session() as session:
+            await session.execute(_INSERT_LOG, batch)
+            await session.commit()
 
 
 async def get_logs(job_id: str, limit: int = 100, since_id: Optional[int] = None) -> list:
@@ -103,7 +268,7 @@ async def get_logs(job_id: str, limit: int = 100, since_id: Optional[int] = None
                 "level": row[2],
                 "message": row[3],
                 "details": json.loads(row[4]) if row[4] else None,
-                "created_at": row[5].isoformat() if row[5] else None
+                "created_at": row[5].isoformat() if isinstance(row[5], datetime) else row[5]
             })
         
         # Reverse if we got DESC order
@@ -113,41 +278,87 @@ async def get_logs(job_id: str, limit: int = 100, since_id: Optional[int] = None
         return logs
 
 
-async def subscribe_to_logs(job_id: str) -> AsyncGenerator[Dict[str, Any], None]:
+async def _heartbeat(queue: asyncio.Queue) -> None:
+    """Periodically queue a keepalive marker for a subscriber"""
+    while True:
+        await asyncio.sleep(KEEPALIVE_INTERVAL)
+        if not queue.full():
+            queue.put_nowait({"type": "keepalive", "timestamp": datetime.utcnow().isoformat()})
+
+
+async def subscribe_to_logs(job_id: str) -> AsyncGenerator[List[Dict[str, Any]], None]:
     """
     Subscribe to live log updates for a job
-    Returns an async generator that yields log entries
+    Returns an async generator that yields batches of log entries,
+    coalescing entries that are already queued when a new one arrives
     """
-    queue = asyncio.Queue()
+    # Snapshot the buffer before subscribing; anything queued up to the
+    # snapshot's last entry was already replayed and is skipped
+    backlog = list(_log_buffers.get(job_id, ()))
+    watermark = backlog[-1]["seq"] if backlog else None
+    
+    queue = asyncio.Queue(maxsize=MAX_SUBSCRIBER_QUEUE_SIZE)
     _log_subscribers[job_id].append(queue)
+    heartbeat = asyncio.create_task(_heartbeat(queue))
     
     try:
         # First send buffered logs
-        for log in _log_buffers.get(job_id, []):
-            yield log
+        if backlog:
+            yield backlog
         
         # Then wait for new logs
         while True:
+            batch = [await queue.get()]
             try:
-                log = await asyncio.wait_for(queue.get(), timeout=30.0)
-                yield log
-            except asyncio.TimeoutError:
-                # Send keepalive
-                yield {"type": "keepalive", "timestamp": datetime.utcnow().isoformat()}
+                while len(batch) < MAX_STREAM_BATCH:
+                    batch.append(queue.get_nowait())
+            except asyncio.QueueEmpty:
+                pass
+            
+            if queue in _lagged_queues and any(log.get("type") == "lagged" for log in batch):
+                _lagged_queues.discard(queue)
+            
+            if watermark is not None:
+                batch = [log for log in batch if log.get("seq", watermark + 1) > watermark]
+                if not batch:
+                    continue
+            yield batch
     finally:
         # Clean up subscription
-        if queue in _log_subscribers.get(job_id, []):
-            _log_subscribers[job_id].remove(queue)
+        heartbeat.cancel()
+        _lagged_queues.discard(queue)
+        subscribers = _log_subscribers.get(job_id)
+        if subscribers and queue in subscribers:
+            subscribers.remove(queue)
+        if not subscribers:
+            _log_subscribers.pop(job_id, None)
 
 
 def get_buffer_logs(job_id: str) -> list:
     """Get logs from in-memory buffer"""
-    return list(_log_buffers.get(job_id, []))
+    return list(_log_buffers.get(job_id, ()))
+
+
+def schedule_buffer_cleanup(job_id: str, delay: float = BUFFER_RETENTION_SECONDS) -> None:
+    """
+    Drop a finished job's in-memory buffer after a grace period
+    Late viewers can still replay the tail; new logs for the job cancel the cleanup
+    """
+    cleanup = _buffer_cleanups.pop(job_id, None)
+    if cleanup:
+        cleanup.cancel()
+    
+    def _cleanup():
+        _buffer_cleanups.pop(job_id, None)
+        _log_buffers.pop(job_id, None)
+    
+    _buffer_cleanups[job_id] = asyncio.get_running_loop().call_later(delay, _cleanup)
 
 
 async def clear_logs(job_id: str) -> None:
     """Clear logs for a job"""
     _log_buffers.pop(job_id, None)
+    _log_subscribers.pop(job_id, None)
     
     async with async_session() as session:
         await session.execute(
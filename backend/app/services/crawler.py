@@ -3,28 +3,138 @@ API Crawler Service - Core crawling logic
 """
 import httpx
 import asyncio
-import random
+import functools
 import json
+import random
+import re
+import time
+import orjson
 import uuid
-from datetime import datetime
-from typing import Dict, Any, Optional, List
-from sqlalchemy import text
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote_plus
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Dict, Any, Optional, List, Tuple
+from sqlalchemy import text, table, column, update, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.curl_parser import parse_curl_command, build_url_with_pagination, CurlParseError
-from app.services.pagination import detect_pagination_type, get_next_pagination_params, _extract_data_array
+from app.services.curl_parser import parse_curl_command, pagination_url_prefix, CurlParseError
+from app.services.pagination import (
+    detect_pagination_type,
+    get_next_pagination_params,
+    make_data_extractor
+)
 from app.services.database import (
     async_session, 
     infer_schema_from_data, 
     table_exists, 
     create_dynamic_table,
-    insert_records
+    insert_records,
+    insert_records_raw,
+    invalidate_table_cache,
+    invalidate_table_info,
+    queue_write,
+    raw_insert_supported,
+    use_session
+)
+from app.services.crawl_logger import (
+    log_info,
+    log_success,
+    log_warning,
+    log_error,
+    log_debug,
+    schedule_buffer_cleanup
 )
-from app.services.crawl_logger import log_info, log_success, log_warning, log_error, log_debug
 from app.models.schemas import PaginationType, CrawlJobStatus
 from app.models.database import CrawlJob, Notification, JobStatus, PaginationType as DBPaginationType
 
 
 MAX_RETRIES = 3
+MAX_BACKOFF = 30.0  # Cap for the jittered exponential backoff, in seconds
+MAX_RETRY_AFTER = 300.0  # Cap for server-requested Retry-After waits, in seconds
+
+# Lowercased pagination type name -> enum, for API input and stored job values
+_PAGINATION_TYPES = {
+    "none": PaginationType.NONE,
+    "page_based": PaginationType.PAGE_BASED,
+    "cursor_based": PaginationType.CURSOR_BASED,
+    "offset_based": PaginationType.OFFSET_BASED,
+}
+_PAGINATION_STATE_KEYS = {
+    PaginationType.PAGE_BASED: "page",
+    PaginationType.OFFSET_BASED: "offset",
+    PaginationType.CURSOR_BASED: "cursor",
+}
+_DB_PAGINATION_TYPES = {
+    "none": DBPaginationType.NONE,
+    "page_based": DBPaginationType.PAGE_BASED,
+    "cursor_based": DBPaginationType.CURSOR_BASED,
+    "offset_based": DBPaginationType.OFFSET_BASED,
+}
+
+# Shared HTTP client so connections (and TLS sessions) are reused across requests and jobs
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _retry_wait(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Seconds to wait before retrying: a server-sent Retry-After (seconds or HTTP date)
+    when present, otherwise jittered exponential backoff
+    """
+    if retry_after:
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            try:
+                seconds = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                seconds = None
+        if seconds is not None:
+            return min(MAX_RETRY_AFTER, max(0.0, seconds))
+    
+    return min(MAX_BACKOFF, 2 ** attempt + random.uniform(0, 1))
+
+
+def _utcnow() -> datetime:
+    """Current UTC time as a naive datetime, matching the stored timestamps"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def get_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            http2=True,
+            # Never persist response cookies - jobs must not leak sessions into each other
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# Bumped whenever a crawl_jobs row changes, used as the ETag for job listings
+_jobs_version = 0
+
+
+def get_jobs_version() -> int:
+    """Get the current crawl_jobs data version"""
+    return _jobs_version
+
+
+def _bump_jobs_version() -> None:
+    """Mark crawl_jobs as changed"""
+    global _jobs_version
+    _jobs_version += 1
 
 
 async def validate_curl_and_test(curl_command: str) -> Dict[str, Any]:
@@ -55,59 +165,59 @@ async def validate_curl_and_test(curl_command: str) -> Dict[str, Any]:
         }
         
         # Make test request
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.request(
-                method=parsed["method"],
-                url=parsed["url"],
-                headers=parsed["headers"],
-                content=parsed["data"] if parsed["data"] else None,
-                cookies=parsed.get("cookies", {})
+        client = get_client()
+        response = await client.request(
+            method=parsed["method"],
+            url=parsed["url"],
+            headers=parsed["headers"],
+            content=parsed["data"] if parsed["data"] else None,
+            cookies=parsed.get("cookies", {})
+        )
+        
+        # Convert headers to serializable dict
+        response_headers = {k: str(v) for k, v in response.headers.items()}
+        
+        # Check response
+        if response.status_code >= 400:
+            result["error"] = f"API returned error status: {response.status_code}"
+            result["test_response"] = {
+                "status_code": response.status_code,
+                "data": None,
+                "headers": response_headers
+            }
+            return result
+        
+        # Try to parse JSON response
+        try:
+            response_data, _ = _decode_json(response.content)
+            result["test_response"] = {
+                "status_code": response.status_code,
+                "data": response_data,
+                "headers": response_headers
+            }
+            
+            # Detect pagination
+            pagination_type, pagination_info = detect_pagination_type(
+                parsed["url"], response_data
             )
+            result["detected_pagination"] = {
+                "type": pagination_type.value,
+                "info": pagination_info
+            }
             
-            # Convert headers to serializable dict
-            response_headers = {k: str(v) for k, v in response.headers.items()}
+            # Infer schema
+            schema = infer_schema_from_data(response_data)
+            result["inferred_schema"] = schema
             
-            # Check response
-            if response.status_code >= 400:
-                result["error"] = f"API returned error status: {response.status_code}"
-                result["test_response"] = {
-                    "status_code": response.status_code,
-                    "data": None,
-                    "headers": response_headers
-                }
-                return result
+            result["is_valid"] = True
             
-            # Try to parse JSON response
-            try:
-                response_data = response.json()
-                result["test_response"] = {
-                    "status_code": response.status_code,
-                    "data": response_data,
-                    "headers": response_headers
-                }
-                
-                # Detect pagination
-                pagination_type, pagination_info = detect_pagination_type(
-                    parsed["url"], response_data
-                )
-                result["detected_pagination"] = {
-                    "type": pagination_type.value,
-                    "info": pagination_info
-                }
-                
-                # Infer schema
-                schema = infer_schema_from_data(response_data)
-                result["inferred_schema"] = schema
-                
-                result["is_valid"] = True
-                
-            except json.JSONDecodeError:
-                result["error"] = "API response is not valid JSON"
-                result["test_response"] = {
-                    "status_code": response.status_code,
-                    "data": response.text[:500],
-                    "headers": response_headers
-                }
+        except json.JSONDecodeError:
+            result["error"] = "API response is not valid JSON"
+            result["test_response"] = {
+                "status_code": response.status_code,
+                "data": response.text[:500],
+                "headers": response_headers
+            }
     
     except CurlParseError as e:
         result["error"] = f"Invalid cURL command: {str(e)}"
@@ -142,20 +252,10 @@ async def create_crawl_job(
     """
     job_id = str(uuid.uuid4())
     
-    # Create table if it doesn't exist
-    if not await table_exists(table_name):
-        await create_dynamic_table(table_name, schema)
-    
     # Convert pagination_type string to enum
-    pagination_enum_map = {
-        "none": DBPaginationType.NONE,
-        "page_based": DBPaginationType.PAGE_BASED,
-        "cursor_based": DBPaginationType.CURSOR_BASED,
-        "offset_based": DBPaginationType.OFFSET_BASED,
-    }
-    db_pagination_type = pagination_enum_map.get(pagination_type, DBPaginationType.NONE)
+    db_pagination_type = _DB_PAGINATION_TYPES.get(pagination_type.lower(), DBPaginationType.NONE)
     
-    # Create job record
+    # Create the job record and the table if it doesn't exist, committed together
     async with async_session() as session:
         job = CrawlJob(
             id=job_id,
@@ -171,8 +271,16 @@ async def create_crawl_job(
             max_pages=max_pages
         )
         session.add(job)
-        await session.commit()
+        try:
+            if not await table_exists(table_name):
+                await create_dynamic_table(table_name, schema, session)
+            await session.commit()
+        except Exception:
+            # A table created above was rolled back too
+            invalidate_table_cache(table_name)
+            raise
     
+    _bump_jobs_version()
     return job_id
 
 
@@ -180,45 +288,39 @@ async def run_crawl_job(job_id: str) -> None:
     """
     Execute a crawl job with live logging
     """
+    # One session for the whole job; it only holds a connection inside a transaction
+    async with async_session() as session:
+        await _run_crawl_job(job_id, session)
+
+
+async def _run_crawl_job(job_id: str, session: AsyncSession) -> None:
+    """Crawl loop of run_crawl_job, with every job update going through session"""
     await log_info(job_id, "🚀 Starting crawl job...", {"job_id": job_id})
     
-    async with async_session() as session:
-        result = await session.execute(
-            text("SELECT * FROM crawl_jobs WHERE id = :id"),
-            {"id": job_id}
-        )
-        job_row = result.fetchone()
-        
-        if not job_row:
-            await log_error(job_id, "Job not found in database")
-            return
-        
-        # Convert row to dict
-        job = {
-            "id": job_row[0],
-            "curl_command": job_row[1],
-            "table_name": job_row[2],
-            "status": job_row[3],
-            "pagination_type": job_row[4],
-            "start_interval": job_row[5],
-            "end_interval": job_row[6],
-            "randomize_interval": job_row[7],
-            "start_date": job_row[8],
-            "end_date": job_row[9],
-            "total_records": job_row[10],
-            "current_page": job_row[11],
-            "cursor_value": job_row[12],
-            "max_pages": job_row[13],
-            "retry_count": job_row[14]
-        }
+    result = await session.execute(
+        text("""SELECT id, curl_command, table_name, status, pagination_type,
+                      start_interval, end_interval, randomize_interval, start_date, end_date,
+                      total_records, current_page, cursor_value, max_pages, retry_count
+               FROM crawl_jobs WHERE id = :id"""),
+        {"id": job_id}
+    )
+    job = result.mappings().first()
+    await session.commit()
+    
+    if not job:
+        await log_error(job_id, "Job not found in database")
+        return
     
     await log_info(job_id, f"📊 Target table: {job['table_name']}")
     await log_info(job_id, f"🔄 Pagination type: {job['pagination_type']}")
     
     # Update status to running
-    await update_job_status(job_id, JobStatus.RUNNING)
+    await update_job_status(job_id, JobStatus.RUNNING, session=session)
     await log_success(job_id, "✅ Job status updated to RUNNING")
     
+    # Insert of the previous page (via the write-behind queue), overlapped with the next request
+    pending_persist = None
+    
     try:
         # Parse cURL
         await log_info(job_id, "🔍 Parsing cURL command...")
@@ -226,18 +328,7 @@ async def run_crawl_job(job_id: str) -> None:
         await log_success(job_id, f"✅ Parsed: {parsed['method']} {parsed['url'][:80]}...")
         
         # Initialize pagination state - convert stored value to enum
-        pagination_type_str = job["pagination_type"]
-        pagination_type_map = {
-            "none": PaginationType.NONE,
-            "NONE": PaginationType.NONE,
-            "page_based": PaginationType.PAGE_BASED,
-            "PAGE_BASED": PaginationType.PAGE_BASED,
-            "cursor_based": PaginationType.CURSOR_BASED,
-            "CURSOR_BASED": PaginationType.CURSOR_BASED,
-            "offset_based": PaginationType.OFFSET_BASED,
-            "OFFSET_BASED": PaginationType.OFFSET_BASED,
-        }
-        pagination_type = pagination_type_map.get(pagination_type_str, PaginationType.NONE)
+        pagination_type = _PAGINATION_TYPES.get((job["pagination_type"] or "").lower(), PaginationType.NONE)
         
         current_state = {
             "page": job["current_page"] or 1,
@@ -245,131 +336,160 @@ async def run_crawl_job(job_id: str) -> None:
             "cursor": job["cursor_value"]
         }
         
+        # The query string is split once; each page only appends the changing value
+        url_prefix = pagination_url_prefix(parsed["url"], pagination_type.value)
+        state_key = _PAGINATION_STATE_KEYS.get(pagination_type)
+        
+        pagination_info = None
+        get_rows = None
+        
         total_records = job["total_records"] or 0
         retry_count = 0
         request_count = 0
         
+        end_dt = job["end_date"]
+        if isinstance(end_dt, str):
+            end_dt = datetime.fromisoformat(end_dt)
+        
         await log_info(job_id, f"📄 Starting from page {current_state['page']}, {total_records} existing records")
         
         while True:
             request_count += 1
+            # One wall-clock timestamp per page, shared by the date check and job updates
+            iter_now = _utcnow()
             
             # Check date constraints
-            if job["end_date"]:
-                end_dt = job["end_date"]
-                if isinstance(end_dt, str):
-                    end_dt = datetime.fromisoformat(end_dt)
-                if datetime.utcnow() > end_dt:
+            if end_dt:
+                if iter_now > end_dt:
                     await log_warning(job_id, "⏰ End date reached, stopping crawl")
+                    total_records = await _await_persist(pending_persist, total_records)
+                    pending_persist = None
                     await update_job_status(job_id, JobStatus.COMPLETED, 
-                                          error_message="End date reached")
+                                          error_message="End date reached", session=session)
                     break
             
             # Check max pages
             if job["max_pages"] and current_state["page"] > job["max_pages"]:
                 await log_warning(job_id, f"📄 Max pages ({job['max_pages']}) reached, stopping crawl")
+                total_records = await _await_persist(pending_persist, total_records)
+                pending_persist = None
                 await update_job_status(job_id, JobStatus.COMPLETED,
-                                      error_message="Max pages reached")
+                                      error_message="Max pages reached", session=session)
                 break
             
             # Build URL with pagination
             current_url = parsed["url"]
-            if pagination_type == PaginationType.PAGE_BASED:
-                current_url = build_url_with_pagination(
-                    parsed["url"], "page_based", page=current_state["page"]
-                )
-            elif pagination_type == PaginationType.OFFSET_BASED:
-                current_url = build_url_with_pagination(
-                    parsed["url"], "offset_based", offset=current_state["offset"]
-                )
-            elif pagination_type == PaginationType.CURSOR_BASED and current_state["cursor"]:
-                current_url = build_url_with_pagination(
-                    parsed["url"], "cursor_based", cursor=current_state["cursor"]
-                )
+            if url_prefix and current_state[state_key] not in (None, ""):
+                current_url = url_prefix + quote_plus(str(current_state[state_key]))
             
             await log_info(job_id, f"🌐 Request #{request_count}: {parsed['method']} {current_url[:100]}...")
             
             # Make request with retry logic
             response_data = None
             for attempt in range(MAX_RETRIES):
+                retry_after = None
                 try:
-                    start_time = datetime.utcnow()
-                    async with httpx.AsyncClient(timeout=30.0) as client:
-                        response = await client.request(
-                            method=parsed["method"],
-                            url=current_url,
-                            headers=parsed["headers"],
-                            content=parsed["data"] if parsed["data"] else None,
-                            cookies=parsed.get("cookies", {})
-                        )
-                        
-                        elapsed = (datetime.utcnow() - start_time).total_seconds()
-                        
+                    start_time = time.perf_counter()
+                    client = get_client()
+                    async with client.stream(
+                        method=parsed["method"],
+                        url=current_url,
+                        headers=parsed["headers"],
+                        content=parsed["data"] if parsed["data"] else None,
+                        cookies=parsed.get("cookies", {})
+                    ) as response:
                         if response.status_code >= 400:
+                            if response.status_code in (429, 503):
+                                retry_after = response.headers.get("Retry-After")
+                            await response.aread()
                             raise Exception(f"HTTP {response.status_code}: {response.text[:200]}")
                         
-                        response_data = response.json()
-                        retry_count = 0  # Reset on success
-                        
-                        await log_success(job_id, f"✅ Response: {response.status_code} ({elapsed:.2f}s)", {
-                            "status_code": response.status_code,
-                            "elapsed": elapsed
-                        })
-                        break
-                        
+                        # Decode straight from the received chunks, without keeping
+                        # a second copy of the body on the response object
+                        body = bytearray()
+                        async for chunk in response.aiter_bytes():
+                            body += chunk
+                    
+                    elapsed = time.perf_counter() - start_time
+                    
+                    response_data, body_is_plain_json = _decode_json(body)
+                    retry_count = 0  # Reset on success
+                    
+                    await log_success(job_id, f"✅ Response: {response.status_code} ({elapsed:.2f}s)", {
+                        "status_code": response.status_code,
+                        "elapsed": elapsed
+                    })
+                    break
+                    
                 except Exception as e:
                     retry_count = attempt + 1
-                    await update_job_retry_count(job_id, retry_count)
+                    total_records = await _await_persist(pending_persist, total_records)
+                    pending_persist = None
+                    await update_job_retry_count(job_id, retry_count, session)
                     await log_warning(job_id, f"⚠️ Attempt {retry_count}/{MAX_RETRIES} failed: {str(e)[:100]}")
                     
                     if retry_count >= MAX_RETRIES:
                         error_msg = f"Failed after {MAX_RETRIES} retries: {str(e)}"
                         await log_error(job_id, f"❌ {error_msg}")
-                        await update_job_status(job_id, JobStatus.FAILED, error_message=error_msg)
-                        await create_notification(
-                            job_id, "error", 
-                            f"Crawl job failed: {error_msg}"
-                        )
+                        await finalize_job(job_id, JobStatus.FAILED, f"Crawl job failed: {error_msg}",
+                                           "error", error_message=error_msg, session=session)
                         return
                     
-                    wait_time = 2 ** attempt
-                    await log_info(job_id, f"⏳ Waiting {wait_time}s before retry...")
+                    wait_time = _retry_wait(attempt, retry_after)
+                    await log_info(job_id, f"⏳ Waiting {wait_time:.1f}s before retry...")
                     await asyncio.sleep(wait_time)
             
+            # The previous page's insert ran alongside this request; collect it
+            total_records = await _await_persist(pending_persist, total_records)
+            pending_persist = None
+            
             if response_data is None:
                 await log_warning(job_id, "📭 No response data, ending crawl")
                 break
             
-            # Extract and insert data
-            data_array = _extract_data_array(response_data)
-            if data_array:
-                inserted = await insert_records(job["table_name"], data_array)
-                total_records += inserted
-                await update_job_progress(job_id, total_records, current_state["page"])
-                await log_success(job_id, f"💾 Inserted {inserted} records (Total: {total_records})", {
-                    "inserted": inserted,
-                    "total": total_records,
-                    "page": current_state["page"]
-                })
-            else:
-                await log_warning(job_id, "📭 No data extracted from response")
+            # Detect the pagination fields and data lookup once, on the first page
+            if get_rows is None:
+                _, pagination_info = detect_pagination_type(parsed["url"], response_data)
+                get_rows = make_data_extractor(response_data)
+            data_array = get_rows(response_data)
+            crawled_page = current_state["page"]
+            
+            # Let SQLite unpack the records from the body when they map 1:1 onto columns
+            raw_path = _raw_json_path(response_data, data_array) if body_is_plain_json else None
+            raw_json = body.decode() if raw_path else None
+            del body
             
             # Get next pagination params
-            _, pagination_info = detect_pagination_type(parsed["url"], response_data)
             next_params = get_next_pagination_params(
-                pagination_type, pagination_info, current_state, response_data
+                pagination_type, pagination_info, current_state, response_data, data_array
             )
             
             if not next_params:
-                # No more pages
+                # No more pages; the last page's rows commit with the terminal status
+                # in finalize_job (its insert savepoint sits inside the session's BEGIN)
+                total_records = await _insert_page(
+                    job_id, job["table_name"], data_array, total_records, crawled_page,
+                    raw_json, raw_path, session
+                )
+                # Logged before the terminal status, since a later log would cancel
+                # the job's scheduled log buffer cleanup
                 await log_success(job_id, f"🎉 Crawl completed! Total records: {total_records}")
-                await update_job_status(job_id, JobStatus.COMPLETED)
-                await create_notification(
-                    job_id, "success",
-                    f"Crawl completed! Collected {total_records} records."
+                await finalize_job(
+                    job_id, JobStatus.COMPLETED,
+                    f"Crawl completed! Collected {total_records} records.", "success",
+                    total_records=total_records, current_page=crawled_page,
+                    retry_count=retry_count, updated_at=iter_now, session=session
                 )
+                invalidate_table_info(job["table_name"])
                 break
             
+            # Insert data and save progress while the polite delay and the next request run
+            pending_persist = asyncio.create_task(_persist_page(
+                job_id, job["table_name"], data_array, total_records, crawled_page,
+                raw_json, raw_path, cursor_value=next_params.get("cursor"), retry_count=retry_count,
+                updated_at=iter_now
+            ))
+            
             # Update state for next iteration
             if "page" in next_params:
                 current_state["page"] = next_params["page"]
@@ -379,7 +499,6 @@ async def run_crawl_job(job_id: str) -> None:
                 await log_debug(job_id, f"📄 Next offset: {next_params['offset']}")
             if "cursor" in next_params:
                 current_state["cursor"] = next_params["cursor"]
-                await update_job_cursor(job_id, next_params["cursor"])
                 await log_debug(job_id, f"📄 Next cursor: {next_params['cursor'][:50]}...")
             
             # Wait between requests
@@ -389,137 +508,304 @@ async def run_crawl_job(job_id: str) -> None:
             await log_info(job_id, f"⏳ Waiting {interval}s before next request...")
             await asyncio.sleep(interval)
     
+    except asyncio.CancelledError:
+        # Paused or stopped; the caller records the new status
+        if pending_persist:
+            await asyncio.gather(pending_persist, return_exceptions=True)
+        await log_info(job_id, "⏹️ Crawl job cancelled")
+        raise
+    
     except Exception as e:
         error_msg = f"Crawl job error: {str(e)}"
         await log_error(job_id, f"❌ {error_msg}")
-        await update_job_status(job_id, JobStatus.FAILED, error_message=error_msg)
-        await create_notification(job_id, "error", error_msg)
+        if pending_persist:
+            await asyncio.gather(pending_persist, return_exceptions=True)
+        await session.rollback()
+        await finalize_job(job_id, JobStatus.FAILED, error_msg, "error", error_message=error_msg,
+                           session=session)
 
 
-async def update_job_status(job_id: str, status: JobStatus, error_message: str = None):
-    """Update job status"""
-    async with async_session() as session:
-        sql = "UPDATE crawl_jobs SET status = :status, updated_at = :updated_at"
-        params = {"status": status.value, "updated_at": datetime.utcnow(), "id": job_id}
-        
-        if error_message:
-            sql += ", error_message = :error_message"
-            params["error_message"] = error_message
-        
-        sql += " WHERE id = :id"
-        await session.execute(text(sql), params)
-        await session.commit()
+async def _await_persist(task: Optional[asyncio.Task], total_records: int) -> int:
+    """Wait for a pipelined page insert, if any, and return the updated record total"""
+    return await task if task else total_records
 
 
-async def update_job_progress(job_id: str, total_records: int, current_page: int):
-    """Update job progress"""
-    async with async_session() as session:
-        await session.execute(
-            text("""UPDATE crawl_jobs 
-                   SET total_records = :total_records, 
-                       current_page = :current_page,
-                       updated_at = :updated_at
-                   WHERE id = :id"""),
-            {
-                "total_records": total_records,
-                "current_page": current_page,
-                "updated_at": datetime.utcnow(),
-                "id": job_id
-            }
-        )
-        await session.commit()
+# 19+ digit runs may be integers beyond 64 bits, which orjson turns into floats
+# (and SQLite's json functions beyond 63 bits)
+_LONG_DIGITS_RE = re.compile(rb"\d{19}")
 
 
-async def update_job_retry_count(job_id: str, retry_count: int):
-    """Update job retry count"""
-    async with async_session() as session:
-        await session.execute(
-            text("UPDATE crawl_jobs SET retry_count = :retry_count, updated_at = :updated_at WHERE id = :id"),
-            {"retry_count": retry_count, "updated_at": datetime.utcnow(), "id": job_id}
-        )
-        await session.commit()
+def _decode_json(body: bytes) -> Tuple[Any, bool]:
+    """
+    Decode a JSON body with orjson, falling back to the stdlib parser for what orjson
+    rejects or approximates (NaN/Infinity, out-of-range numbers, very large integers)
+    Returns (data, True if orjson decoded it); only those bodies are handed to
+    SQLite's json functions, which would also reject or round such literals
+    """
+    if _LONG_DIGITS_RE.search(body) is None:
+        try:
+            return orjson.loads(body), True
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(body), False
 
 
-async def update_job_cursor(job_id: str, cursor_value: str):
-    """Update job cursor value"""
-    async with async_session() as session:
-        await session.execute(
-            text("UPDATE crawl_jobs SET cursor_value = :cursor_value, updated_at = :updated_at WHERE id = :id"),
-            {"cursor_value": cursor_value, "updated_at": datetime.utcnow(), "id": job_id}
+def _raw_json_path(response_data: Any, data_array: list) -> Optional[str]:
+    """
+    JSON path of the page's records if they can be inserted straight from the body:
+    the array is the body itself or a top-level field, and no key of any record needs renaming
+    """
+    if not data_array:
+        return None
+    keys = set()
+    for record in data_array:
+        if not isinstance(record, dict):
+            return None
+        keys.update(record)
+    if any(char in key for key in keys for char in ' -"'):
+        return None
+    
+    if response_data is data_array:
+        return "$"
+    if isinstance(response_data, dict):
+        for key, value in response_data.items():
+            if value is data_array and '"' not in key:
+                return f'$."{key}"'
+    return None
+
+
+async def _insert_page(
+    job_id: str,
+    table_name: str,
+    data_array: list,
+    total_records: int,
+    page: int,
+    raw_json: Optional[str] = None,
+    raw_path: Optional[str] = None,
+    session: Optional[AsyncSession] = None
+) -> int:
+    """
+    Insert a page of records and return the updated total record count
+    With raw_json/raw_path the records are inserted from the response body text
+    """
+    if data_array:
+        if raw_path and await raw_insert_supported(table_name):
+            inserted = await insert_records_raw(table_name, raw_json, raw_path, session)
+        else:
+            inserted = await insert_records(table_name, data_array, session)
+        total_records += inserted
+        await log_success(job_id, f"💾 Inserted {inserted} records (Total: {total_records})", {
+            "inserted": inserted,
+            "total": total_records,
+            "page": page
+        })
+    else:
+        await log_warning(job_id, "📭 No data extracted from response")
+    return total_records
+
+
+async def _persist_page(
+    job_id: str,
+    table_name: str,
+    data_array: list,
+    total_records: int,
+    page: int,
+    raw_json: Optional[str] = None,
+    raw_path: Optional[str] = None,
+    cursor_value: Optional[str] = None,
+    retry_count: Optional[int] = None,
+    updated_at: Optional[datetime] = None
+) -> int:
+    """
+    Insert a page of records and save the job's progress
+    Both go through the write-behind queue and are committed together, in one
+    transaction with the pages other running jobs queued at the same time
+    Returns the updated total record count
+    """
+    async def write(db: AsyncSession) -> int:
+        new_total = await _insert_page(
+            job_id, table_name, data_array, total_records, page, raw_json, raw_path, db
         )
-        await session.commit()
+        statement, params = _job_update_params(
+            job_id,
+            total_records=new_total,
+            current_page=page,
+            cursor_value=cursor_value,
+            retry_count=retry_count,
+            updated_at=updated_at
+        )
+        await db.execute(statement, params)
+        return new_total
+    
+    total_records = await queue_write(write)
+    _job_updated(job_id, None)
+    invalidate_table_info(table_name)
+    return total_records
 
 
-async def create_notification(job_id: str, type: str, message: str):
-    """Create a notification"""
-    async with async_session() as session:
-        notification = Notification(
+# Untyped crawl_jobs columns for job updates; values are written as-is (e.g. lowercase status)
+_JOB_UPDATE_COLUMNS = (
+    "total_records", "current_page", "cursor_value", "retry_count", "status", "error_message"
+)
+_crawl_jobs = table("crawl_jobs", column("id"), column("updated_at"), *map(column, _JOB_UPDATE_COLUMNS))
+
+
+@functools.lru_cache(maxsize=None)
+def _job_update_statement(fields: tuple):
+    """
+    Build (once per combination of updated fields) the UPDATE for a job
+    Reusing the statement object lets SQLAlchemy skip recompiling it
+    """
+    values = {name: bindparam(f"new_{name}") for name in fields}
+    values["updated_at"] = bindparam("new_updated_at")
+    return (
+        update(_crawl_jobs)
+        .where(_crawl_jobs.c.id == bindparam("job_id"))
+        .values(values)
+    )
+
+
+def _job_update_params(
+    job_id: str,
+    total_records: Optional[int] = None,
+    current_page: Optional[int] = None,
+    cursor_value: Optional[str] = None,
+    retry_count: Optional[int] = None,
+    status: Optional[JobStatus] = None,
+    error_message: Optional[str] = None,
+    updated_at: Optional[datetime] = None
+):
+    """
+    Build a single UPDATE statement for the given job fields
+    Only fields that are not None are written
+    """
+    fields = {
+        "total_records": total_records,
+        "current_page": current_page,
+        "cursor_value": cursor_value,
+        "retry_count": retry_count,
+        "status": status.value if status else None,
+        "error_message": error_message
+    }
+    fields = {key: value for key, value in fields.items() if value is not None}
+    params = {f"new_{key}": value for key, value in fields.items()}
+    params.update({"new_updated_at": updated_at or _utcnow(), "job_id": job_id})
+    return _job_update_statement(tuple(fields)), params
+
+
+def _job_updated(job_id: str, status: Optional[JobStatus]) -> None:
+    """Invalidate cached job listings and release the log buffer of finished jobs"""
+    _bump_jobs_version()
+    if status in (JobStatus.COMPLETED, JobStatus.FAILED):
+        schedule_buffer_cleanup(job_id)
+
+
+async def update_job_state(
+    job_id: str,
+    total_records: Optional[int] = None,
+    current_page: Optional[int] = None,
+    cursor_value: Optional[str] = None,
+    retry_count: Optional[int] = None,
+    status: Optional[JobStatus] = None,
+    error_message: Optional[str] = None,
+    updated_at: Optional[datetime] = None,
+    session: Optional[AsyncSession] = None
+):
+    """
+    Update job fields with a single UPDATE statement
+    Runs on (and commits) the caller's session if given
+    """
+    statement, params = _job_update_params(
+        job_id, total_records, current_page, cursor_value, retry_count, status, error_message,
+        updated_at
+    )
+    async with use_session(session) as db:
+        await db.execute(statement, params)
+        await db.commit()
+    
+    _job_updated(job_id, status)
+
+
+async def finalize_job(
+    job_id: str,
+    status: JobStatus,
+    message: str,
+    notif_type: str,
+    error_message: Optional[str] = None,
+    session: Optional[AsyncSession] = None,
+    **fields
+):
+    """
+    Write a job's terminal status and its dashboard notification
+    in a single transaction (on the caller's session if given)
+    """
+    statement, params = _job_update_params(
+        job_id, status=status, error_message=error_message, **fields
+    )
+    async with use_session(session) as db:
+        await db.execute(statement, params)
+        db.add(Notification(
             id=str(uuid.uuid4()),
             job_id=job_id,
-            type=type,
+            type=notif_type,
             message=message
-        )
-        session.add(notification)
-        await session.commit()
+        ))
+        await db.commit()
+    
+    _job_updated(job_id, status)
+
+
+async def update_job_status(
+    job_id: str,
+    status: JobStatus,
+    error_message: str = None,
+    session: Optional[AsyncSession] = None
+):
+    """Update job status"""
+    await update_job_state(job_id, status=status, error_message=error_message or None, session=session)
+
 
+async def update_job_retry_count(job_id: str, retry_count: int, session: Optional[AsyncSession] = None):
+    """Update job retry count"""
+    await update_job_state(job_id, retry_count=retry_count, session=session)
 
-async def get_all_jobs() -> List[Dict[str, Any]]:
-    """Get all crawl jobs"""
+
+async def get_all_jobs(limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+    """Get crawl jobs, newest first (all of them unless limit is given)"""
     async with async_session() as session:
-        result = await session.execute(text("SELECT * FROM crawl_jobs ORDER BY created_at DESC"))
-        rows = result.fetchall()
-        
-        jobs = []
-        for row in rows:
-            jobs.append({
-                "id": row[0],
-                "curl_command": row[1][:100] + "..." if len(row[1]) > 100 else row[1],
-                "table_name": row[2],
-                "status": row[3],
-                "pagination_type": row[4],
-                "total_records": row[10],
-                "current_page": row[11],
-                "retry_count": row[14],
-                "error_message": row[15],
-                "created_at": row[16],
-                "updated_at": row[17]
-            })
-        
-        return jobs
+        result = await session.execute(text("""
+            SELECT id,
+                   CASE WHEN length(curl_command) > 100
+                        THEN substr(curl_command, 1, 100) || '...'
+                        ELSE curl_command END AS curl_command,
+                   table_name, status, pagination_type, total_records, current_page,
+                   retry_count, error_message, created_at, updated_at
+            FROM crawl_jobs
+            ORDER BY created_at DESC
+            LIMIT :limit OFFSET :offset
+        """), {"limit": -1 if limit is None else limit, "offset": offset})
+        return [dict(row) for row in result.mappings()]
 
 
 async def get_job_by_id(job_id: str) -> Optional[Dict[str, Any]]:
     """Get a specific job by ID"""
     async with async_session() as session:
         result = await session.execute(
-            text("SELECT * FROM crawl_jobs WHERE id = :id"),
+            text("""SELECT id, curl_command, table_name, status, pagination_type,
+                          start_interval, end_interval, randomize_interval, start_date, end_date,
+                          total_records, current_page, cursor_value, max_pages, retry_count,
+                          error_message, created_at, updated_at
+                   FROM crawl_jobs WHERE id = :id"""),
             {"id": job_id}
         )
-        row = result.fetchone()
+        row = result.mappings().first()
         
         if not row:
             return None
         
-        return {
-            "id": row[0],
-            "curl_command": row[1],
-            "table_name": row[2],
-            "status": row[3],
-            "pagination_type": row[4],
-            "start_interval": row[5],
-            "end_interval": row[6],
-            "randomize_interval": bool(row[7]),
-            "start_date": row[8],
-            "end_date": row[9],
-            "total_records": row[10],
-            "current_page": row[11],
-            "cursor_value": row[12],
-            "max_pages": row[13],
-            "retry_count": row[14],
-            "error_message": row[15],
-            "created_at": row[16],
-            "updated_at": row[17]
-        }
+        job = dict(row)
+        job["randomize_interval"] = bool(job["randomize_interval"])
+        return job
 
 
 async def get_notifications(unread_only: bool = False) -> List[Dict[str, Any]]:
@@ -2,9 +2,12 @@
 cURL command parser service
 """
 import re
+import copy
 import shlex
-from typing import Dict, Any, Optional, Tuple
-from urllib.parse import urlparse, parse_qs
+import functools
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
+from urllib.parse import urlparse, parse_qs, unquote_plus, quote_plus, urlunparse
 
 
 class CurlParseError(Exception):
@@ -12,6 +15,42 @@ class CurlParseError(Exception):
     pass
 
 
+# POSIX shell-style tokenizing in a single regex pass:
+# a token is a run of double-quoted, single-quoted, backslash-escaped or bare segments
+_TOKEN_RE = re.compile(r"""(?:"(?:[^"\\]|\\.)*"|'[^']*'|\\.|[^ \t\r\n"'\\]+)+""", re.S)
+_SEGMENT_RE = re.compile(r""""((?:[^"\\]|\\.)*)"|'([^']*)'|\\(.)|([^ \t\r\n"'\\]+)""", re.S)
+_WHITESPACE = " \t\r\n"
+_DQUOTE_ESCAPE_RE = re.compile(r'\\(["\\])')
+
+
+def _tokenize(command: str) -> list:
+    """
+    Split a command line like shlex.split (POSIX mode)
+    Falls back to shlex for input the regex can't fully consume (e.g. unbalanced quotes)
+    """
+    tokens = []
+    pos = 0
+    for match in _TOKEN_RE.finditer(command):
+        if command[pos:match.start()].strip(_WHITESPACE):
+            return shlex.split(command)
+        pos = match.end()
+        
+        parts = []
+        for segment in _SEGMENT_RE.finditer(match.group()):
+            double_quoted, single_quoted, escaped, bare = segment.groups()
+            if double_quoted is not None:
+                parts.append(_DQUOTE_ESCAPE_RE.sub(r"\1", double_quoted))
+            elif single_quoted is not None:
+                parts.append(single_quoted)
+            else:
+                parts.append(escaped if escaped is not None else bare)
+        tokens.append("".join(parts))
+    
+    if command[pos:].strip(_WHITESPACE):
+        return shlex.split(command)
+    return tokens
+
+
 def parse_curl_command(curl_command: str) -> Dict[str, Any]:
     """
     Parse a cURL command into its components
@@ -19,6 +58,13 @@ def parse_curl_command(curl_command: str) -> Dict[str, Any]:
     Returns:
         Dict containing method, url, headers, data
     """
+    # Callers may mutate the result, so never hand out the cached dict itself
+    return copy.deepcopy(_parse_curl_command_cached(curl_command))
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_curl_command_cached(curl_command: str) -> Dict[str, Any]:
+    """Parse a cURL command, memoized on the raw command string"""
     try:
         # Clean up the command
         curl_command = curl_command.strip()
@@ -31,7 +77,7 @@ def parse_curl_command(curl_command: str) -> Dict[str, Any]:
         
         # Tokenize
         try:
-            tokens = shlex.split(curl_command)
+            tokens = _tokenize(curl_command)
         except ValueError as e:
             raise CurlParseError(f"Failed to parse command: {e}")
         
@@ -127,75 +173,69 @@ def parse_curl_command(curl_command: str) -> Dict[str, Any]:
         raise CurlParseError(f"Unexpected error parsing cURL: {e}")
 
 
+# Common pagination parameter names by category
+_PAGINATION_PARAM_NAMES = {
+    "page": ["page", "p", "pageNumber", "page_number"],
+    "offset": ["offset", "skip", "start"],
+    "limit": ["limit", "size", "per_page", "pageSize", "page_size", "count"],
+    "cursor": ["cursor", "after", "next_token", "continuation", "token"],
+}
+# Lowercased parameter name -> category, so each query parameter is classified with one lookup
+_PAGINATION_NAME_CATEGORY = {
+    name.lower(): category
+    for category, names in _PAGINATION_PARAM_NAMES.items()
+    for name in names
+}
+
+
 def extract_pagination_params(url: str) -> Dict[str, Any]:
     """
     Extract pagination-related parameters from URL
     """
+    return dict(_extract_pagination_params_cached(url))
+
+
+@functools.lru_cache(maxsize=128)
+def _extract_pagination_params_cached(url: str) -> Mapping[str, Any]:
+    """Extract pagination parameters, memoized on the URL"""
     parsed = urlparse(url)
     query_params = parse_qs(parsed.query)
     
     pagination_params = {}
     
-    # Common pagination parameter names
-    page_params = ["page", "p", "pageNumber", "page_number"]
-    offset_params = ["offset", "skip", "start"]
-    limit_params = ["limit", "size", "per_page", "pageSize", "page_size", "count"]
-    cursor_params = ["cursor", "after", "next_token", "continuation", "token"]
-    
     for param, values in query_params.items():
-        param_lower = param.lower()
-        if any(pp.lower() == param_lower for pp in page_params):
-            pagination_params["page_param"] = param
-            pagination_params["page_value"] = values[0] if values else None
-        elif any(op.lower() == param_lower for op in offset_params):
-            pagination_params["offset_param"] = param
-            pagination_params["offset_value"] = values[0] if values else None
-        elif any(lp.lower() == param_lower for lp in limit_params):
-            pagination_params["limit_param"] = param
-            pagination_params["limit_value"] = values[0] if values else None
-        elif any(cp.lower() == param_lower for cp in cursor_params):
-            pagination_params["cursor_param"] = param
-            pagination_params["cursor_value"] = values[0] if values else None
+        category = _PAGINATION_NAME_CATEGORY.get(param.lower())
+        if category:
+            pagination_params[f"{category}_param"] = param
+            pagination_params[f"{category}_value"] = values[0] if values else None
     
-    return pagination_params
+    return MappingProxyType(pagination_params)
+
+
+# Pagination type -> (pagination_params category, default query parameter name)
+_PAGINATION_URL_PARAMS = {
+    "page_based": ("page", "page"),
+    "offset_based": ("offset", "offset"),
+    "cursor_based": ("cursor", "cursor"),
+}
 
 
-def build_url_with_pagination(base_url: str, pagination_type: str, 
-                              page: Optional[int] = None,
-                              offset: Optional[int] = None,
-                              cursor: Optional[str] = None,
-                              limit: Optional[int] = None) -> str:
+@functools.lru_cache(maxsize=128)
+def pagination_url_prefix(base_url: str, pagination_type: str) -> Optional[str]:
     """
-    Build a new URL with updated pagination parameters
+    Return the base URL with its pagination parameter stripped and re-opened at the end,
+    so a page URL is just prefix + quote_plus(value). None if the type has no URL parameter
     """
-    from urllib.parse import urlencode, urlparse, parse_qs, urlunparse
+    if pagination_type not in _PAGINATION_URL_PARAMS:
+        return None
+    category, default_name = _PAGINATION_URL_PARAMS[pagination_type]
+    param_name = _extract_pagination_params_cached(base_url).get(f"{category}_param", default_name)
     
     parsed = urlparse(base_url)
-    query_params = parse_qs(parsed.query)
-    
-    # Flatten query params
-    flat_params = {k: v[0] if v else "" for k, v in query_params.items()}
-    
-    # Extract known pagination param names
-    pagination_info = extract_pagination_params(base_url)
-    
-    if pagination_type == "page_based" and page is not None:
-        param_name = pagination_info.get("page_param", "page")
-        flat_params[param_name] = str(page)
-    
-    elif pagination_type == "offset_based" and offset is not None:
-        param_name = pagination_info.get("offset_param", "offset")
-        flat_params[param_name] = str(offset)
-    
-    elif pagination_type == "cursor_based" and cursor is not None:
-        param_name = pagination_info.get("cursor_param", "cursor")
-        flat_params[param_name] = cursor
-    
-    if limit is not None and "limit_param" in pagination_info:
-        flat_params[pagination_info["limit_param"]] = str(limit)
-    
-    # Rebuild URL
-    new_query = urlencode(flat_params)
-    new_parsed = parsed._replace(query=new_query)
-    
-    return urlunparse(new_parsed)
+    kept = [
+        pair for pair in parsed.query.split("&")
+        if pair and unquote_plus(pair.split("=", 1)[0]) != param_name
+    ]
+    base = urlunparse(parsed._replace(query="&".join(kept), fragment=""))
+    sep = "&" if kept else "?"
+    return f"{base}{sep}{quote_plus(param_name)}="
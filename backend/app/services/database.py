@@ -3,23 +3,252 @@ Database service for managing connections and dynamic table creation
 """
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import text, inspect
-from typing import Dict, Any, List, Optional
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import event, text
+from typing import Dict, Any, List, Optional, Tuple, AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager
+import asyncio
 import json
+import logging
+import orjson
+import os
+import sqlite3
+import time
 
 from app.models.database import Base
 
+logger = logging.getLogger(__name__)
+
 # SQLite database
-DATABASE_URL = "sqlite+aiosqlite:///./api_crawler.db"
+DATABASE_URL = os.environ.get("CRAWLER_DATABASE_URL", "sqlite+aiosqlite:///./api_crawler.db")
+
+# Known tables: name -> {"columns": data column names, "column_info": [{"name", "type"}] of all
+# columns, "spec": insert spec, "statements": {op: text()}}
+# Loaded from sqlite_master once and then kept current by create_dynamic_table
+_TABLE_CACHE: Dict[str, Any] = {"loaded": False, "tables": {}}
+
+# Tables of the app itself, left out of the dynamic table listing
+_INTERNAL_TABLES = frozenset({"crawl_jobs", "notifications", "crawl_logs", "sqlite_sequence"})
+
+# Row queries by suffix: from an offset, or seeking past an _id. The "page" and
+# "stream" ops share them and differ only in how _table_statement executes them
+_ROWS_SQL = {
+    "": 'SELECT * FROM "{table}" LIMIT :limit OFFSET :offset',
+    "_after": 'SELECT * FROM "{table}" WHERE _id > :after ORDER BY _id LIMIT :limit',
+}
+
+# Per-table queries, built into text() once per table by _table_statement
+_TABLE_SQL = {
+    "columns": 'PRAGMA table_info("{table}")',
+    "count": 'SELECT COUNT(*) FROM "{table}"',
+    **{f"{op}{suffix}": sql for op in ("page", "stream") for suffix, sql in _ROWS_SQL.items()},
+}
+
+# Table metadata for the tables endpoints, so dashboard polling skips PRAGMA/COUNT queries
+TABLE_LIST_CACHE_TTL = 10.0
+TABLE_INFO_CACHE_TTL = 30.0
+_TABLE_LIST_CACHE = {"ts": 0.0, "tables": []}
+_TABLE_INFO_CACHE: Dict[str, tuple] = {}  # table_name -> (ts, info)
+
+# Bound-parameter limit per statement (SQLITE_MAX_VARIABLE_NUMBER), 999 before SQLite 3.32
+SQLITE_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+# Terms allowed in one compound SELECT (SQLITE_MAX_COMPOUND_SELECT)
+SQLITE_MAX_COMPOUND_SELECT = 500
+
+# Rows fetched per round trip to the aiosqlite thread when streaming table data
+STREAM_BATCH_SIZE = 1000
+
+# Write-behind queue of (work, future) for queue_write; the writer applies
+# every write queued at the time in one transaction
+_write_queue: asyncio.Queue = asyncio.Queue()
+_write_task: Optional[asyncio.Task] = None
+MAX_WRITE_COALESCE = 64
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# Bumped whenever a dynamic table is created or written, used as the ETag for table listings
+_tables_version = 0
+
+# Statement logging costs a logging call per query, so it is opt-in for debugging
+SQL_ECHO = os.environ.get("CRAWLER_SQL_ECHO", "").lower() in ("1", "true", "yes")
+# With echo on, log at most this many statements per second (0 = all of them)
+SQL_ECHO_RATE = float(os.environ.get("CRAWLER_SQL_ECHO_RATE", "0"))
+
+# Seconds SQLite waits on a locked database before failing with "database is locked"
+SQLITE_BUSY_TIMEOUT = 30
+
+# aiosqlite defaults to NullPool, which opens a new connection (and thread) per session,
+# reruns the PRAGMAs and starts with a cold page cache; keep a small pool of them instead
+DB_POOL_SIZE = 5
+DB_POOL_OVERFLOW = 10
+
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=SQL_ECHO,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_POOL_OVERFLOW,
+    connect_args={"timeout": SQLITE_BUSY_TIMEOUT},
+)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+class _SamplingFilter(logging.Filter):
+    """Token bucket letting through at most rate log records per second"""
+    
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.capacity = max(rate * 2, 1.0)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+if SQL_ECHO and SQL_ECHO_RATE > 0:
+    logging.getLogger("sqlalchemy.engine.Engine").addFilter(_SamplingFilter(SQL_ECHO_RATE))
+
+
+if engine.url.get_backend_name() == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        Tune SQLite for many concurrent writers (WAL, fewer fsyncs, larger cache)
+        synchronous=NORMAL may lose the last commits on power loss but never corrupts;
+        crawl progress is replayable, so job updates don't need a full fsync each
+        """
+        # Take transaction control from pysqlite (see _begin_sqlite_transaction)
+        dbapi_connection.isolation_level = None
+        
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+    
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin_sqlite_transaction(conn):
+        """
+        Emit BEGIN ourselves: pysqlite only opens a transaction before DML, so a
+        SAVEPOINT issued first (begin_nested) would run, and commit, on its own
+        """
+        conn.exec_driver_sql("BEGIN")
+
+
 async def init_db():
     """Initialize the database and create tables"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        
+        # create_all skips indexes on tables that already exist
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_crawl_logs_job_id_id ON crawl_logs (job_id, id)"))
+        await conn.execute(text("DROP INDEX IF EXISTS ix_crawl_logs_job_id"))
+    
+    await _load_table_cache()
+    
+    global _write_task
+    if _write_task is None or _write_task.done():
+        _write_task = asyncio.create_task(_write_behind())
+
+
+async def close_db():
+    """Flush queued writes and close the pooled database connections"""
+    global _write_task
+    # Writes queued from here on run in their own transaction (see queue_write)
+    task, _write_task = _write_task, None
+    if task is not None:
+        _write_queue.put_nowait(None)
+        await task
+    await engine.dispose()
+
+
+async def queue_write(work: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+    """
+    Run work(session) in the background writer's next transaction and return its result
+    work must not commit; writes queued by concurrent jobs share one commit.
+    Without a running writer (e.g. before init_db) work runs in its own transaction
+    """
+    if _write_task is None or _write_task.done():
+        async with async_session() as session:
+            result = await work(session)
+            await session.commit()
+        return result
+    
+    future = asyncio.get_running_loop().create_future()
+    _write_queue.put_nowait((work, future))
+    return await future
+
+
+async def _write_behind() -> None:
+    """
+    Background task that drains the write queue, one transaction per batch
+    A None entry, queued last by close_db, stops the writer once the writes
+    before it are applied; if it dies, queued callers get an error
+    """
+    try:
+        async with async_session() as session:
+            stopping = False
+            while not stopping:
+                batch = [await _write_queue.get()]
+                try:
+                    while len(batch) < MAX_WRITE_COALESCE:
+                        batch.append(_write_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    pass
+                
+                if None in batch:
+                    stopping = True
+                    batch = [item for item in batch if item is not None]
+                
+                if batch:
+                    await _apply_writes(session, batch)
+    finally:
+        while not _write_queue.empty():
+            item = _write_queue.get_nowait()
+            if item is not None and not item[1].done():
+                item[1].set_exception(RuntimeError("Write-behind writer stopped"))
+
+
+async def _apply_writes(session: AsyncSession, batch: List[tuple]) -> None:
+    """
+    Run queued writes, each in its own SAVEPOINT so a failing one is rolled back alone,
+    commit them once and resolve every caller's future, whatever fails on the way
+    """
+    outcomes: Dict[asyncio.Future, tuple] = {}
+    batch_error: BaseException = RuntimeError("Queued write was not committed")
+    committed = False
+    try:
+        for work, future in batch:
+            try:
+                async with session.begin_nested():
+                    outcomes[future] = (await work(session), None)
+            except Exception as e:
+                outcomes[future] = (None, e)
+        await session.commit()
+        committed = True
+    except Exception as e:
+        batch_error = e
+        try:
+            await session.rollback()
+        except Exception as rollback_error:
+            logger.error("Error rolling back queued writes: %s", rollback_error)
+    finally:
+        for _, future in batch:
+            if future.done():
+                continue  # caller was cancelled
+            result, error = outcomes[future] if committed else (None, batch_error)
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
 
 
 async def get_session() -> AsyncSession:
@@ -28,20 +257,45 @@ async def get_session() -> AsyncSession:
         yield session
 
 
+@asynccontextmanager
+async def use_session(session: Optional[AsyncSession] = None) -> AsyncGenerator[AsyncSession, None]:
+    """Use the caller's session if given, otherwise a new one closed on exit"""
+    if session is not None:
+        yield session
+        return
+    async with async_session() as new_session:
+        yield new_session
+
+
+# SQLite type for each JSON-decoded Python type, looked up by exact type
+# bools are stored as int, dicts/lists as JSON strings
+_PY2SQL = {
+    bool: "INTEGER",
+    int: "INTEGER",
+    float: "REAL",
+    str: "TEXT",
+    dict: "TEXT",
+    list: "TEXT",
+    type(None): "TEXT",
+}
+
+
+# Response keys whose list holds the records, in the order they are tried
+_SCHEMA_WRAPPER_KEYS = ("data", "results", "items", "records")
+
+
 def python_type_to_sql(value: Any) -> str:
     """Convert Python type to SQLite type"""
-    if value is None:
-        return "TEXT"
-    elif isinstance(value, bool):
-        return "INTEGER"  # SQLite stores bools as int
-    elif isinstance(value, int):
+    sql_type = _PY2SQL.get(type(value))
+    if sql_type:
+        return sql_type
+    
+    # Subclasses of the types above (bool is an int); anything else is stored as TEXT
+    if isinstance(value, int):
         return "INTEGER"
-    elif isinstance(value, float):
+    if isinstance(value, float):
         return "REAL"
-    elif isinstance(value, (dict, list)):
-        return "TEXT"  # Store as JSON string
-    else:
-        return "TEXT"
+    return "TEXT"
 
 
 def infer_schema_from_data(data: Any) -> Dict[str, str]:
@@ -49,145 +303,425 @@ def infer_schema_from_data(data: Any) -> Dict[str, str]:
     Infer database schema from API response data
     Returns a dict of column_name: sql_type
     """
-    schema = {}
-    
-    # Handle list of objects (most common API response)
-    if isinstance(data, list) and len(data) > 0:
-        sample = data[0]
-        if isinstance(sample, dict):
-            for key, value in sample.items():
-                schema[key] = python_type_to_sql(value)
-    # Handle single object
-    elif isinstance(data, dict):
-        # Check for common wrapper patterns
-        for wrapper_key in ['data', 'results', 'items', 'records']:
-            if wrapper_key in data and isinstance(data[wrapper_key], list):
-                return infer_schema_from_data(data[wrapper_key])
-        
-        # Treat as single record
-        for key, value in data.items():
-            if not isinstance(value, (dict, list)):
-                schema[key] = python_type_to_sql(value)
-            else:
-                schema[key] = "TEXT"  # Store complex types as JSON
+    # Unwrap common wrapper patterns such as {"data": [...]}
+    if isinstance(data, dict):
+        for wrapper_key in _SCHEMA_WRAPPER_KEYS:
+            if isinstance(data.get(wrapper_key), list):
+                data = data[wrapper_key]
+                break
+    
+    # Handle list of objects (most common API response); only the first record is sampled
+    if isinstance(data, list):
+        data = data[0] if data else None
+        if not isinstance(data, dict):
+            return {}
+    
+    # A single record; complex types are stored as JSON, which _PY2SQL maps to TEXT
+    if isinstance(data, dict):
+        return {key: python_type_to_sql(value) for key, value in data.items()}
     
-    return schema
+    return {}
+
+
+def invalidate_table_cache(table_name: Optional[str] = None) -> None:
+    """Force cached table names and metadata to be reloaded (e.g. after a DROP)"""
+    _TABLE_CACHE["loaded"] = False
+    invalidate_table_info(table_name)
+
+
+def get_tables_version() -> int:
+    """Get the current dynamic tables data version"""
+    return _tables_version
+
+
+def invalidate_table_info(table_name: Optional[str] = None) -> None:
+    """Drop cached metadata for a table (or all tables) after its contents change"""
+    global _tables_version
+    _tables_version += 1
+    _TABLE_LIST_CACHE["ts"] = 0.0
+    if table_name:
+        _TABLE_INFO_CACHE.pop(table_name, None)
+    else:
+        _TABLE_INFO_CACHE.clear()
+
+
+async def _load_table_cache() -> None:
+    """Read every table and its columns (one pragma_table_info join) into the table cache"""
+    # Read-only, so a plain connection rather than engine.begin()'s transaction
+    async with engine.connect() as conn:
+        result = await conn.execute(text("""
+            SELECT m.name, p.name, p.type
+            FROM sqlite_master m, pragma_table_info(m.name) p
+            WHERE m.type = 'table'
+            ORDER BY m.rowid, p.cid
+        """))
+        tables: Dict[str, Any] = {}
+        for table_name, column_name, column_type in result.fetchall():
+            entry = tables.get(table_name)
+            if entry is None:
+                entry = tables[table_name] = {
+                    "columns": [], "column_info": [], "spec": None, "statements": {}
+                }
+            entry["column_info"].append({"name": column_name, "type": column_type})
+            if column_name not in ("_id", "_crawled_at"):
+                entry["columns"].append(column_name)
+    _TABLE_CACHE["tables"] = tables
+    _TABLE_CACHE["loaded"] = True
+
+
+def _table_statement(table_name: str, op: str):
+    """
+    text() for one of the _TABLE_SQL queries on a table
+    Kept in the table's cache entry so the SQL is formatted and parsed once per table
+    """
+    entry = _TABLE_CACHE["tables"].get(table_name)
+    statements = entry["statements"] if entry is not None else {}
+    stmt = statements.get(op)
+    if stmt is None:
+        stmt = text(_TABLE_SQL[op].format(table=table_name))
+        if op.startswith("stream"):
+            stmt = stmt.execution_options(yield_per=STREAM_BATCH_SIZE)
+        statements[op] = stmt
+    return stmt
 
 
 async def table_exists(table_name: str) -> bool:
     """Check if a table exists in the database"""
-    async with engine.begin() as conn:
-        result = await conn.execute(
-            text("SELECT name FROM sqlite_master WHERE type='table' AND name=:name"),
-            {"name": table_name}
-        )
-        return result.fetchone() is not None
+    if not _TABLE_CACHE["loaded"]:
+        await _load_table_cache()
+    
+    return table_name in _TABLE_CACHE["tables"]
 
 
-async def create_dynamic_table(table_name: str, schema: Dict[str, str]) -> bool:
+async def create_dynamic_table(
+    table_name: str,
+    schema: Dict[str, str],
+    session: Optional[AsyncSession] = None
+) -> bool:
     """
     Create a table dynamically based on inferred schema
+    With a session the CREATE TABLE joins its transaction; the caller commits and
+    calls invalidate_table_cache if that fails
     """
     if await table_exists(table_name):
         return False  # Table already exists
     
     # Build CREATE TABLE statement
     columns = ["_id INTEGER PRIMARY KEY AUTOINCREMENT", "_crawled_at DATETIME DEFAULT CURRENT_TIMESTAMP"]
+    column_info = [{"name": "_id", "type": "INTEGER"}, {"name": "_crawled_at", "type": "DATETIME"}]
+    data_columns = []
     for col_name, col_type in schema.items():
         # Sanitize column name
         safe_col_name = col_name.replace(" ", "_").replace("-", "_")
         columns.append(f'"{safe_col_name}" {col_type}')
+        column_info.append({"name": safe_col_name, "type": col_type})
+        data_columns.append(safe_col_name)
     
     create_sql = f'CREATE TABLE "{table_name}" ({", ".join(columns)})'
     
-    async with engine.begin() as conn:
-        await conn.execute(text(create_sql))
+    if session is not None:
+        await session.execute(text(create_sql))
+    else:
+        async with engine.begin() as conn:
+            await conn.execute(text(create_sql))
     
+    # Cached from the known schema rather than read back with PRAGMA table_info
+    _TABLE_CACHE["tables"][table_name] = {
+        "columns": data_columns,
+        "column_info": column_info,
+        "spec": (frozenset(schema), tuple(schema), tuple(data_columns)),
+        "statements": {}
+    }
+    invalidate_table_info(table_name)
     return True
 
 
-async def insert_records(table_name: str, records: List[Dict[str, Any]]) -> int:
+async def insert_records(
+    table_name: str,
+    records: List[Dict[str, Any]],
+    session: Optional[AsyncSession] = None
+) -> int:
     """
     Insert records into a dynamic table
     Returns the number of records inserted
+    With a session the rows join its transaction; the caller commits and
+    then calls invalidate_table_info
     """
     if not records:
         return 0
     
-    async with async_session() as session:
+    json_dumps = _json_text
+    spec_keys, spec_order, spec_columns = await _get_column_spec(table_name)
+    
+    # Build positional value tuples, grouping consecutive rows with the same columns
+    groups: List[tuple] = []
+    for record in records:
+        if record.keys() == spec_keys:
+            # Same keys as the table schema: column names are already known
+            keys = spec_columns
+            values = [record[key] for key in spec_order]
+        else:
+            # Prepare data - sanitize column names
+            processed = {key.replace(" ", "_").replace("-", "_"): value for key, value in record.items()}
+            keys = tuple(processed)
+            values = processed.values()
+        
+        # Convert complex types to JSON strings
+        row = tuple([json_dumps(value) if isinstance(value, (dict, list)) else value for value in values])
+        if groups and groups[-1][0] == keys:
+            groups[-1][1].append(row)
+        else:
+            groups.append((keys, [row]))
+    
+    async with use_session(session) as db:
         count = 0
-        for record in records:
-            # Prepare data - convert complex types to JSON strings
-            processed = {}
-            for key, value in record.items():
-                safe_key = key.replace(" ", "_").replace("-", "_")
-                if isinstance(value, (dict, list)):
-                    processed[safe_key] = json.dumps(value)
-                else:
-                    processed[safe_key] = value
-            
+        for keys, rows in groups:
             # Build INSERT statement
-            columns = ", ".join([f'"{k}"' for k in processed.keys()])
-            placeholders = ", ".join([f":{k}" for k in processed.keys()])
+            columns = ", ".join([f'"{k}"' for k in keys])
+            row_values = f"({', '.join('?' * len(keys))})"
             
-            insert_sql = f'INSERT INTO "{table_name}" ({columns}) VALUES ({placeholders})'
+            # Pack as many rows per statement as the bound-parameter limit allows
+            chunk_size = max(1, SQLITE_MAX_VARIABLES // max(1, len(keys)))
             
             try:
-                await session.execute(text(insert_sql), processed)
-                count += 1
-            except Exception as e:
-                print(f"Error inserting record: {e}")
+                async with db.begin_nested():
+                    # Taken inside the block: the session only emits the SAVEPOINT
+                    # when a connection is requested from the nested transaction
+                    conn = await db.connection()
+                    for start in range(0, len(rows), chunk_size):
+                        chunk = rows[start:start + chunk_size]
+                        await conn.exec_driver_sql(
+                            f'INSERT INTO "{table_name}" ({columns}) VALUES {", ".join([row_values] * len(chunk))}',
+                            tuple(value for row in chunk for value in row)
+                        )
+                count += len(rows)
                 continue
+            except Exception as e:
+                logger.warning("Error inserting batch into %s, retrying row by row: %s", table_name, e)
+            
+            # The savepoint undid the batch; insert what we can one row at a time
+            conn = await db.connection()
+            insert_sql = f'INSERT INTO "{table_name}" ({columns}) VALUES {row_values}'
+            for row in rows:
+                try:
+                    await conn.exec_driver_sql(insert_sql, row)
+                    count += 1
+                except Exception as e:
+                    logger.error("Error inserting record into %s: %s", table_name, e)
+                    continue
         
-        await session.commit()
-        return count
+        if session is None:
+            await db.commit()
+    
+    if session is None:
+        invalidate_table_info(table_name)
+    return count
+
+
+def _json_text(value: Any) -> str:
+    """Serialize a dict/list column value as compact JSON, the same form json_extract stores"""
+    try:
+        return orjson.dumps(value).decode()
+    except orjson.JSONEncodeError:
+        # e.g. integers beyond 64 bits, which only the stdlib encoder handles
+        return json.dumps(value)
+
+
+async def _get_insert_columns(table_name: str) -> List[str]:
+    """Get a table's data columns (without _id/_crawled_at), cached per table"""
+    entry = _TABLE_CACHE["tables"].get(table_name)
+    if entry:
+        return entry["columns"]
+    
+    # Not in the cache (e.g. created outside the app since it was loaded)
+    async with async_session() as session:
+        result = await session.execute(_table_statement(table_name, "columns"))
+        return [row[1] for row in result.fetchall() if row[1] not in ("_id", "_crawled_at")]
+
+
+async def _get_column_spec(table_name: str) -> Tuple[frozenset, tuple, tuple]:
+    """
+    Insert spec for a table: (record key set, record keys in column order, column names)
+    Built from the schema at creation, or from the table's columns for existing tables
+    """
+    entry = _TABLE_CACHE["tables"].get(table_name)
+    if entry and entry.get("spec"):
+        return entry["spec"]
+    
+    columns = tuple(await _get_insert_columns(table_name))
+    spec = (frozenset(columns), columns, columns)
+    if entry is not None:
+        entry["spec"] = spec
+    return spec
+
+
+async def raw_insert_supported(table_name: str) -> bool:
+    """
+    Whether insert_records_raw stores the same rows as insert_records for a table:
+    it reads each column by its name, so no column may have been renamed from its record key
+    """
+    _, spec_order, spec_columns = await _get_column_spec(table_name)
+    return spec_order == spec_columns
+
+
+async def insert_records_raw(
+    table_name: str,
+    json_text: str,
+    json_path: str = "$",
+    session: Optional[AsyncSession] = None
+) -> int:
+    """
+    Insert the objects of a JSON array straight from the response body
+    SQLite's json_each/json_extract unpack the rows, so no per-record Python
+    objects are built; nested objects/arrays are stored as compact JSON text
+    Returns the number of records inserted (session works as in insert_records)
+    Only for tables where raw_insert_supported holds and records whose keys need no renaming
+    """
+    entry = _TABLE_CACHE["tables"].get(table_name)
+    insert_stmt = entry["statements"].get("insert_raw") if entry is not None else None
+    if insert_stmt is None:
+        columns = await _get_insert_columns(table_name)
+        if not columns:
+            return 0
+        
+        column_list = ", ".join(f'"{col}"' for col in columns)
+        extracts = ", ".join(
+            f"""json_extract(value, '$."{col.replace("'", "''")}"')""" for col in columns
+        )
+        insert_stmt = text(
+            f'INSERT INTO "{table_name}" ({column_list}) '
+            f"SELECT {extracts} FROM json_each(:json, :path) WHERE type = 'object'"
+        )
+        if entry is not None:
+            entry["statements"]["insert_raw"] = insert_stmt
+    
+    async with use_session(session) as db:
+        result = await db.execute(insert_stmt, {"json": json_text, "path": json_path})
+        if session is None:
+            await db.commit()
+    
+    if session is None:
+        invalidate_table_info(table_name)
+    return result.rowcount
 
 
 async def get_table_info(table_name: str) -> Optional[Dict[str, Any]]:
     """Get information about a table"""
+    cached = _TABLE_INFO_CACHE.get(table_name)
+    if cached and time.monotonic() - cached[0] < TABLE_INFO_CACHE_TTL:
+        return cached[1]
+    
     if not await table_exists(table_name):
         return None
     
+    # Columns come from the table cache; only the row count needs a query
     async with async_session() as session:
-        # Get columns
-        result = await session.execute(text(f'PRAGMA table_info("{table_name}")'))
-        columns = [{"name": row[1], "type": row[2]} for row in result.fetchall()]
-        
-        # Get row count
-        result = await session.execute(text(f'SELECT COUNT(*) FROM "{table_name}"'))
+        result = await session.execute(_table_statement(table_name, "count"))
         row_count = result.scalar()
-        
-        return {
+    
+    info = {
+        "name": table_name,
+        "columns": _TABLE_CACHE["tables"][table_name]["column_info"],
+        "row_count": row_count
+    }
+    _TABLE_INFO_CACHE[table_name] = (time.monotonic(), info)
+    return info
+
+
+async def _count_rows(names: List[str]) -> Dict[str, int]:
+    """Row counts of the given tables, with one UNION ALL query per SQLITE_MAX_COMPOUND_SELECT of them"""
+    row_counts = {}
+    async with async_session() as session:
+        for start in range(0, len(names), SQLITE_MAX_COMPOUND_SELECT):
+            chunk = names[start:start + SQLITE_MAX_COMPOUND_SELECT]
+            count_sql = " UNION ALL ".join(
+                f'SELECT :name_{i}, COUNT(*) FROM "{name}"' for i, name in enumerate(chunk)
+            )
+            result = await session.execute(
+                text(count_sql), {f"name_{i}": name for i, name in enumerate(chunk)}
+            )
+            row_counts.update(result.fetchall())
+    return row_counts
+
+
+async def get_all_tables() -> List[Dict[str, Any]]:
+    """
+    Get information about all dynamic tables
+    Columns come from the table cache and row counts from UNION ALL queries
+    of up to 500 tables each, instead of two queries per table
+    """
+    if time.monotonic() - _TABLE_LIST_CACHE["ts"] < TABLE_LIST_CACHE_TTL:
+        return _TABLE_LIST_CACHE["tables"]
+    
+    if not _TABLE_CACHE["loaded"]:
+        await _load_table_cache()
+    columns = {
+        table_name: entry["column_info"]
+        for table_name, entry in _TABLE_CACHE["tables"].items()
+        if table_name not in _INTERNAL_TABLES
+    }
+    
+    row_counts = await _count_rows(list(columns))
+    
+    now = time.monotonic()
+    tables = []
+    for table_name, table_columns in columns.items():
+        info = {
             "name": table_name,
-            "columns": columns,
-            "row_count": row_count
+            "columns": table_columns,
+            "row_count": row_counts.get(table_name, 0)
         }
+        _TABLE_INFO_CACHE[table_name] = (now, info)
+        tables.append(info)
+    
+    _TABLE_LIST_CACHE["tables"] = tables
+    _TABLE_LIST_CACHE["ts"] = now
+    return tables
 
 
-async def get_all_tables() -> List[Dict[str, Any]]:
-    """Get information about all dynamic tables"""
-    async with async_session() as session:
-        result = await session.execute(
-            text("SELECT name FROM sqlite_master WHERE type='table' AND name NOT IN ('crawl_jobs', 'notifications', 'sqlite_sequence')")
-        )
-        tables = []
-        for row in result.fetchall():
-            table_info = await get_table_info(row[0])
-            if table_info:
-                tables.append(table_info)
-        return tables
+def _page_query(table_name: str, op: str, limit: int, offset: int, after_id: Optional[int]):
+    """
+    Statement and params for one page of rows
+    With after_id the page seeks on the _id primary key instead of scanning past offset rows
+    """
+    if after_id is not None:
+        return _table_statement(table_name, f"{op}_after"), {"limit": limit, "after": after_id}
+    return _table_statement(table_name, op), {"limit": limit, "offset": offset}
 
 
-async def get_table_data(table_name: str, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-    """Get data from a table"""
+async def get_table_data(
+    table_name: str,
+    limit: int = 100,
+    offset: int = 0,
+    after_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Get data from a table, from offset or from the row after _id after_id"""
     if not await table_exists(table_name):
         return []
     
     async with async_session() as session:
-        result = await session.execute(
-            text(f'SELECT * FROM "{table_name}" LIMIT :limit OFFSET :offset'),
-            {"limit": limit, "offset": offset}
-        )
-        rows = result.fetchall()
-        columns = result.keys()
-        return [dict(zip(columns, row)) for row in rows]
+        result = await session.execute(*_page_query(table_name, "page", limit, offset, after_id))
+        # zip over plain row tuples is faster here than result.mappings()
+        columns = tuple(result.keys())
+        return [dict(zip(columns, row)) for row in result.fetchall()]
+
+
+async def stream_table_data(
+    table_name: str,
+    limit: int = 100,
+    offset: int = 0,
+    after_id: Optional[int] = None
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Stream rows from a table one at a time
+    Uses a server-side cursor so large result sets are never fully materialized
+    """
+    if not await table_exists(table_name):
+        return
+    
+    async with async_session() as session:
+        result = await session.stream(*_page_query(table_name, "stream", limit, offset, after_id))
+        columns = tuple(result.keys())
+        async for rows in result.partitions():
+            for row in rows:
+                yield dict(zip(columns, row))
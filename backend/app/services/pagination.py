@@ -1,11 +1,42 @@
 """
 Pagination detection and handling service
 """
-from typing import Dict, Any, Optional, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, Any, Optional, Tuple
 from app.models.schemas import PaginationType
 from app.services.curl_parser import extract_pagination_params
 
 
+# Response keys hinting at each pagination style, in priority order, with set
+# versions so a response's keys are matched with one intersection instead of a loop
+CURSOR_INDICATORS = ("next_cursor", "cursor", "nextToken", "next_token",
+                     "continuation", "continuationToken", "after", "endCursor")
+PAGE_INDICATORS = ("page", "currentPage", "current_page", "pageNumber",
+                   "page_number", "totalPages", "total_pages")
+OFFSET_INDICATORS = ("offset", "skip", "start", "from")
+PAGINATION_WRAPPERS = ("pagination", "paging", "meta", "_pagination", "_meta")
+NEXT_FIELDS = ("next", "next_page", "nextPage")
+
+CURSOR_SET = frozenset(CURSOR_INDICATORS)
+PAGE_SET = frozenset(PAGE_INDICATORS)
+OFFSET_SET = frozenset(OFFSET_INDICATORS)
+WRAPPER_SET = frozenset(PAGINATION_WRAPPERS)
+NEXT_SET = frozenset(NEXT_FIELDS)
+
+# Every top-level key the response checks in detect_pagination_type look at
+RESPONSE_HINT_SET = CURSOR_SET | WRAPPER_SET | NEXT_SET | {"links"}
+
+
+def _first_present(data: dict, ordered: tuple, candidates: frozenset) -> Optional[str]:
+    """Highest-priority key of ordered present in data, or None"""
+    hits = data.keys() & candidates
+    if not hits:
+        return None
+    if len(hits) == 1:
+        return next(iter(hits))
+    return next(key for key in ordered if key in hits)
+
+
 def detect_pagination_type(url: str, response_data: Any) -> Tuple[PaginationType, Dict[str, Any]]:
     """
     Detect the type of pagination from URL parameters and API response
@@ -18,55 +49,43 @@ def detect_pagination_type(url: str, response_data: Any) -> Tuple[PaginationType
     # First check URL for pagination params
     url_params = extract_pagination_params(url)
     
-    # Check response for pagination indicators
-    response_indicators = _analyze_response_for_pagination(response_data)
-    
     # Combine URL and response analysis
     
-    # Cursor-based pagination indicators
-    cursor_indicators = ["next_cursor", "cursor", "nextToken", "next_token", 
-                         "continuation", "continuationToken", "after", "endCursor"]
-    
-    # Page-based indicators
-    page_indicators = ["page", "currentPage", "current_page", "pageNumber", 
-                       "page_number", "totalPages", "total_pages"]
-    
-    # Offset-based indicators
-    offset_indicators = ["offset", "skip", "start", "from"]
-    
-    # Check response for cursor-based pagination
-    if isinstance(response_data, dict):
+    # Check response for cursor-based pagination, unless none of its
+    # top-level keys can match, in which case only the URL decides
+    if isinstance(response_data, dict) and not RESPONSE_HINT_SET.isdisjoint(response_data):
         # Check for cursor fields in response
-        for indicator in cursor_indicators:
-            if indicator in response_data:
-                pagination_info["cursor_field"] = indicator
-                pagination_info["cursor_value"] = response_data[indicator]
-                pagination_info.update(url_params)
-                return PaginationType.CURSOR_BASED, pagination_info
+        indicator = _first_present(response_data, CURSOR_INDICATORS, CURSOR_SET)
+        if indicator:
+            pagination_info["cursor_field"] = indicator
+            pagination_info["cursor_value"] = response_data[indicator]
+            pagination_info.update(url_params)
+            return PaginationType.CURSOR_BASED, pagination_info
         
         # Check nested pagination object
-        for wrapper in ["pagination", "paging", "meta", "_pagination", "_meta"]:
-            if wrapper in response_data and isinstance(response_data[wrapper], dict):
+        wrappers = response_data.keys() & WRAPPER_SET
+        for wrapper in PAGINATION_WRAPPERS:
+            if wrapper in wrappers and isinstance(response_data[wrapper], dict):
                 pag_obj = response_data[wrapper]
                 
                 # Check for cursor
-                for indicator in cursor_indicators:
-                    if indicator in pag_obj:
-                        pagination_info["cursor_field"] = f"{wrapper}.{indicator}"
-                        pagination_info["cursor_value"] = pag_obj[indicator]
-                        pagination_info.update(url_params)
-                        return PaginationType.CURSOR_BASED, pagination_info
+                indicator = _first_present(pag_obj, CURSOR_INDICATORS, CURSOR_SET)
+                if indicator:
+                    pagination_info["cursor_field"] = f"{wrapper}.{indicator}"
+                    pagination_info["cursor_value"] = pag_obj[indicator]
+                    pagination_info.update(url_params)
+                    return PaginationType.CURSOR_BASED, pagination_info
                 
                 # Check for page info
-                for indicator in page_indicators:
-                    if indicator in pag_obj:
-                        pagination_info["page_field"] = f"{wrapper}.{indicator}"
-                        pagination_info.update(url_params)
-                        return PaginationType.PAGE_BASED, pagination_info
+                indicator = _first_present(pag_obj, PAGE_INDICATORS, PAGE_SET)
+                if indicator:
+                    pagination_info["page_field"] = f"{wrapper}.{indicator}"
+                    pagination_info.update(url_params)
+                    return PaginationType.PAGE_BASED, pagination_info
         
         # Check for next_page or next URL
-        if "next" in response_data or "next_page" in response_data or "nextPage" in response_data:
-            next_field = "next" if "next" in response_data else ("next_page" if "next_page" in response_data else "nextPage")
+        next_field = _first_present(response_data, NEXT_FIELDS, NEXT_SET)
+        if next_field:
             if response_data[next_field]:  # Not None/null
                 pagination_info["next_url_field"] = next_field
                 pagination_info.update(url_params)
@@ -97,42 +116,23 @@ def detect_pagination_type(url: str, response_data: Any) -> Tuple[PaginationType
     return PaginationType.NONE, pagination_info
 
 
-def _analyze_response_for_pagination(response_data: Any) -> Dict[str, Any]:
-    """
-    Analyze response structure for pagination clues
-    """
-    info = {}
-    
-    if isinstance(response_data, dict):
-        # Check for total count fields
-        for field in ["total", "totalCount", "total_count", "count", "totalItems", "total_items"]:
-            if field in response_data:
-                info["total_field"] = field
-                info["total_value"] = response_data[field]
-                break
-        
-        # Check for has_more or similar flags
-        for field in ["has_more", "hasMore", "has_next", "hasNext", "more"]:
-            if field in response_data:
-                info["has_more_field"] = field
-                info["has_more_value"] = response_data[field]
-                break
-    
-    return info
-
-
 def get_next_pagination_params(pagination_type: PaginationType, 
                                 pagination_info: Dict[str, Any],
                                 current_state: Dict[str, Any],
-                                response_data: Any) -> Optional[Dict[str, Any]]:
+                                response_data: Any,
+                                data: Optional[list] = None) -> Optional[Dict[str, Any]]:
     """
     Get the next pagination parameters based on current state and response
+    Pass the already extracted data array as data to skip looking it up again
     
     Returns None if there's no next page
     """
     if pagination_type == PaginationType.NONE:
         return None
     
+    if data is None:
+        data = _extract_data_array(response_data)
+    
     if pagination_type == PaginationType.PAGE_BASED:
         current_page = current_state.get("page", 1)
         
@@ -155,7 +155,6 @@ def get_next_pagination_params(pagination_type: PaginationType,
                                 return None
         
         # Check if response data is empty
-        data = _extract_data_array(response_data)
         if not data or len(data) == 0:
             return None
         
@@ -169,7 +168,6 @@ def get_next_pagination_params(pagination_type: PaginationType,
         limit = current_state.get("limit", pagination_info.get("limit_value", 20))
         
         # Check if response data is empty
-        data = _extract_data_array(response_data)
         if not data or len(data) == 0:
             return None
         
@@ -191,35 +189,13 @@ def get_next_pagination_params(pagination_type: PaginationType,
         # Direct cursor field
         cursor_field = pagination_info.get("cursor_field")
         if cursor_field:
-            if "." in cursor_field:
-                parts = cursor_field.split(".")
-                obj = response_data
-                for part in parts:
-                    if isinstance(obj, dict) and part in obj:
-                        obj = obj[part]
-                    else:
-                        obj = None
-                        break
-                cursor_value = obj
-            else:
-                cursor_value = response_data.get(cursor_field)
+            cursor_value = _compile_path(cursor_field)(response_data)
         
         # Check next URL field
         if not cursor_value:
             next_field = pagination_info.get("next_url_field")
             if next_field:
-                if "." in next_field:
-                    parts = next_field.split(".")
-                    obj = response_data
-                    for part in parts:
-                        if isinstance(obj, dict) and part in obj:
-                            obj = obj[part]
-                        else:
-                            obj = None
-                            break
-                    cursor_value = obj
-                else:
-                    cursor_value = response_data.get(next_field)
+                cursor_value = _compile_path(next_field)(response_data)
         
         if not cursor_value:
             # Check for has_more = false
@@ -228,7 +204,6 @@ def get_next_pagination_params(pagination_type: PaginationType,
                 return None
             
             # Check if data is empty
-            data = _extract_data_array(response_data)
             if not data or len(data) == 0:
                 return None
         
@@ -243,13 +218,52 @@ def get_next_pagination_params(pagination_type: PaginationType,
     return None
 
 
+@lru_cache(maxsize=64)
+def _compile_path(path: str) -> Callable[[Any], Any]:
+    """
+    Build a getter for a dotted field path such as "pagination.next_cursor"
+    Cached per path so the split happens once per job instead of on every page
+    """
+    if "." not in path:
+        return lambda obj: obj.get(path) if isinstance(obj, dict) else None
+    
+    parts = tuple(path.split("."))
+    
+    def get(obj: Any) -> Any:
+        for part in parts:
+            if not isinstance(obj, dict):
+                return None
+            obj = obj.get(part)
+        return obj
+    return get
+
+
+_DATA_KEYS = ("data", "results", "items", "records", "entries", "list")
+
+
+def make_data_extractor(response_data: Any) -> Callable[[Any], list]:
+    """
+    Specialize _extract_data_array for one response shape
+    The returned function reads the key found in this response directly and
+    only falls back to the generic scan when a later page looks different
+    """
+    if isinstance(response_data, dict):
+        for key in _DATA_KEYS:
+            if isinstance(response_data.get(key), list):
+                def get_rows(data: Any) -> list:
+                    rows = data.get(key) if isinstance(data, dict) else None
+                    return rows if isinstance(rows, list) else _extract_data_array(data)
+                return get_rows
+    return _extract_data_array
+
+
 def _extract_data_array(response_data: Any) -> list:
     """Extract the main data array from response"""
     if isinstance(response_data, list):
         return response_data
     
     if isinstance(response_data, dict):
-        for key in ["data", "results", "items", "records", "entries", "list"]:
+        for key in _DATA_KEYS:
             if key in response_data and isinstance(response_data[key], list):
                 return response_data[key]
     
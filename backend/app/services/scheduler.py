@@ -2,9 +2,13 @@
 Scheduler service for managing crawl jobs
 """
 import asyncio
+import os
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.jobstores.memory import MemoryJobStore
-from typing import Optional
+from typing import Dict, Optional
+
+# Crawl jobs allowed to run at once; further jobs wait (still pending) for a free slot
+MAX_CONCURRENT_JOBS = int(os.environ.get("CRAWLER_MAX_CONCURRENT_JOBS", "8"))
 
 
 class SchedulerService:
@@ -15,37 +19,55 @@ class SchedulerService:
             jobstores={'default': MemoryJobStore()},
             job_defaults={'coalesce': False, 'max_instances': 3}
         )
-        self._running_jobs = {}
+        self._running_jobs: Dict[str, asyncio.Task] = {}
+        self._job_slots: Optional[asyncio.Semaphore] = None  # created on the running loop
     
     def start(self):
         """Start the scheduler"""
         if not self.scheduler.running:
             self.scheduler.start()
     
-    def shutdown(self):
-        """Shutdown the scheduler"""
+    async def shutdown(self):
+        """Shutdown the scheduler, waiting for cancelled jobs to finish their cleanup"""
         if self.scheduler.running:
             self.scheduler.shutdown(wait=False)
+        tasks = list(self._running_jobs.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
     
     def schedule_job(self, job_id: str, run_immediately: bool = True):
         """Schedule a crawl job"""
         from app.services.crawler import run_crawl_job
         
         if run_immediately:
-            # Run immediately in background
+            if self._job_slots is None:
+                self._job_slots = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+            
+            # Run immediately in background as a plain task; APScheduler is only
+            # worth its dispatch overhead for jobs with a trigger
             async def run_job():
-                await run_crawl_job(job_id)
+                async with self._job_slots:
+                    await run_crawl_job(job_id)
             
-            self.scheduler.add_job(
-                run_job,
-                id=f"crawl_{job_id}",
-                replace_existing=True
-            )
+            task = asyncio.create_task(run_job())
+            self._running_jobs[job_id] = task
+            task.add_done_callback(lambda done: self._forget_job(job_id, done))
         
         return True
     
-    def cancel_job(self, job_id: str) -> bool:
-        """Cancel a scheduled job"""
+    def _forget_job(self, job_id: str, task: asyncio.Task):
+        """Drop a finished task, unless the job was already rescheduled"""
+        if self._running_jobs.get(job_id) is task:
+            del self._running_jobs[job_id]
+    
+    async def cancel_job(self, job_id: str) -> bool:
+        """Cancel a scheduled or running job, waiting for a running one to wind down"""
+        task = self._running_jobs.pop(job_id, None)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return True
         try:
             self.scheduler.remove_job(f"crawl_{job_id}")
             return True
@@ -54,6 +76,8 @@ class SchedulerService:
     
     def get_job_status(self, job_id: str) -> Optional[str]:
         """Get the status of a scheduled job"""
+        if job_id in self._running_jobs:
+            return "scheduled"
         job = self.scheduler.get_job(f"crawl_{job_id}")
         if job:
             return "scheduled"
@@ -0,0 +1,21 @@
+"""
+HTTP caching helpers for polled list endpoints
+"""
+import uuid
+from typing import Optional
+from fastapi import Request, Response
+
+# Version counters restart with the process, so tag ETags with a per-run id
+_INSTANCE_ID = uuid.uuid4().hex[:8]
+
+
+def make_etag(version: int) -> str:
+    """Build a weak ETag for a data version counter"""
+    return f'W/"{_INSTANCE_ID}-{version}"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response if the client already holds this version"""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
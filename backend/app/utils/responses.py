@@ -0,0 +1,21 @@
+"""
+Response classes for the API
+"""
+import json
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+class ORJSONFallbackResponse(ORJSONResponse):
+    """ORJSONResponse that falls back to the stdlib encoder for content orjson refuses"""
+    
+    def render(self, content: Any) -> bytes:
+        try:
+            return super().render(content)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which the crawler keeps from upstream payloads
+            return json.dumps(
+                content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+            ).encode("utf-8")
@@ -0,0 +1,40 @@
+"""
+Shared test fixtures
+"""
+import asyncio
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import closing
+
+import pytest
+
+# Point the app at a throwaway database before anything imports it
+DB_DIR = tempfile.mkdtemp(prefix="crawler-tests-")
+os.environ["CRAWLER_DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(DB_DIR, 'crawler.db')}"
+
+from app.services.database import close_db, engine, init_db  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def run():
+    """
+    Run a coroutine against the test database
+    Everything shares one event loop, since the write-behind queue is bound to it
+    """
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(init_db())
+    yield loop.run_until_complete
+    loop.run_until_complete(close_db())
+    loop.close()
+    shutil.rmtree(DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def committed_rows():
+    """Rows of a table as seen from a separate connection, i.e. the committed ones"""
+    def count(table_name: str) -> int:
+        with closing(sqlite3.connect(engine.url.database)) as conn:
+            return conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+    return count
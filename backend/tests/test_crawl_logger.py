@@ -0,0 +1,23 @@
+"""
+Tests for the crawl logger
+"""
+import asyncio
+
+from app.services.crawl_logger import MAX_SUBSCRIBER_QUEUE_SIZE, _notify_subscriber
+
+
+def log_entry(n: int) -> dict:
+    return {"job_id": "job", "level": "info", "message": f"log {n}", "created_at": f"t{n}", "seq": n}
+
+
+def test_slow_subscriber_gets_one_lagged_marker():
+    queue = asyncio.Queue(maxsize=MAX_SUBSCRIBER_QUEUE_SIZE)
+    for n in range(2 * MAX_SUBSCRIBER_QUEUE_SIZE):
+        _notify_subscriber(queue, log_entry(n))
+    
+    entries = [queue.get_nowait() for _ in range(queue.qsize())]
+    assert len(entries) == MAX_SUBSCRIBER_QUEUE_SIZE
+    assert sum(entry.get("type") == "lagged" for entry in entries) == 1
+    # Only the oldest logs were dropped
+    logs = [entry["seq"] for entry in entries if "seq" in entry]
+    assert logs == list(range(2 * MAX_SUBSCRIBER_QUEUE_SIZE - len(logs), 2 * MAX_SUBSCRIBER_QUEUE_SIZE))
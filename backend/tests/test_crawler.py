@@ -0,0 +1,33 @@
+"""
+Tests for the crawler service
+"""
+from app.models.database import JobStatus
+from app.services.crawler import _insert_page, create_crawl_job, finalize_job, get_job_by_id
+from app.services.database import async_session
+
+
+def test_final_page_commits_with_terminal_status(run, committed_rows):
+    job_id = run(create_crawl_job("curl 'http://example.com/items'", "final_page", "none", {"n": "INTEGER"}))
+    records = [{"n": 1}, {"n": 2}]
+    
+    async def crash_before_status():
+        async with async_session() as session:
+            await _insert_page(job_id, "final_page", records, 0, 1, session=session)
+            assert committed_rows("final_page") == 0
+            # Closed without finalize_job, as if the job died between the two writes
+    
+    run(crash_before_status())
+    assert committed_rows("final_page") == 0
+    assert run(get_job_by_id(job_id))["status"] != JobStatus.COMPLETED.value
+    
+    async def finish():
+        async with async_session() as session:
+            total = await _insert_page(job_id, "final_page", records, 0, 1, session=session)
+            assert committed_rows("final_page") == 0
+            await finalize_job(job_id, JobStatus.COMPLETED, "Crawl completed!", "success",
+                               total_records=total, session=session)
+    
+    run(finish())
+    assert committed_rows("final_page") == 2
+    job = run(get_job_by_id(job_id))
+    assert (job["status"], job["total_records"]) == (JobStatus.COMPLETED.value, 2)
@@ -0,0 +1,82 @@
+"""
+Tests for the database service
+"""
+import asyncio
+import sqlite3
+from contextlib import closing
+
+from sqlalchemy import text
+
+from app.services import database
+from app.services.database import (
+    SQLITE_MAX_COMPOUND_SELECT, create_dynamic_table, engine, get_all_tables, insert_records, queue_write
+)
+
+
+def insert_value(table_name: str, n: int, seen: list, committed_rows):
+    """Queued write recording the committed row count before inserting n"""
+    async def work(session):
+        seen.append(committed_rows(table_name))
+        await session.execute(text(f'INSERT INTO "{table_name}" (n) VALUES (:n)'), {"n": n})
+        return n
+    return work
+
+
+def test_queued_writes_commit_together(run, committed_rows):
+    run(create_dynamic_table("queued_batch", {"n": "INTEGER"}))
+    seen = []
+    
+    async def write_batch():
+        return await asyncio.gather(*(
+            queue_write(insert_value("queued_batch", n, seen, committed_rows)) for n in range(3)
+        ))
+    
+    assert run(write_batch()) == [0, 1, 2]
+    assert seen == [0, 0, 0]
+    assert committed_rows("queued_batch") == 3
+
+
+def test_failing_queued_write_is_rolled_back_alone(run, committed_rows):
+    run(create_dynamic_table("queued_failure", {"n": "INTEGER"}))
+    seen = []
+    
+    async def fail(session):
+        await session.execute(text('INSERT INTO "queued_failure" (n) VALUES (99)'))
+        raise ValueError("boom")
+    
+    async def write_batch():
+        return await asyncio.gather(
+            queue_write(insert_value("queued_failure", 1, seen, committed_rows)),
+            queue_write(fail),
+            queue_write(insert_value("queued_failure", 2, seen, committed_rows)),
+            return_exceptions=True
+        )
+    
+    first, failed, last = run(write_batch())
+    assert (first, last) == (1, 2)
+    assert isinstance(failed, ValueError)
+    with closing(sqlite3.connect(engine.url.database)) as conn:
+        assert conn.execute('SELECT n FROM "queued_failure" ORDER BY n').fetchall() == [(1,), (2,)]
+
+
+def test_failed_insert_batch_is_undone_before_row_by_row_retry(run, committed_rows, monkeypatch):
+    run(create_dynamic_table("insert_retry", {"n": "INTEGER"}))
+    monkeypatch.setattr(database, "SQLITE_MAX_VARIABLES", 2)  # one row per statement
+    
+    # The second row's _id clashes, so the batch fails after the first row went in
+    records = [{"_id": 1, "n": 1}, {"_id": 1, "n": 2}]
+    assert run(insert_records("insert_retry", records)) == 1
+    assert committed_rows("insert_retry") == 1
+
+
+def test_table_listing_counts_more_tables_than_one_compound_select_allows(run, monkeypatch):
+    names = [f"many_{i}" for i in range(SQLITE_MAX_COMPOUND_SELECT + 100)]
+    for name in names:
+        run(create_dynamic_table(name, {"n": "INTEGER"}))
+    run(insert_records(names[-1], [{"n": 1}, {"n": 2}]))
+    monkeypatch.setitem(database._TABLE_LIST_CACHE, "ts", 0.0)
+    
+    row_counts = {table["name"]: table["row_count"] for table in run(get_all_tables())}
+    assert set(names) <= set(row_counts)
+    assert row_counts[names[0]] == 0
+    assert row_counts[names[-1]] == 2
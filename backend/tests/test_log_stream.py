@@ -0,0 +1,29 @@
+"""
+Tests for the live log stream endpoint
+"""
+import asyncio
+
+from app.routers import crawler as crawler_router
+
+
+def test_stream_sends_markers_in_queue_order(monkeypatch):
+    async def subscribe(job_id):
+        yield [
+            {"message": "a", "seq": 1},
+            {"type": "lagged", "job_id": job_id, "timestamp": "t"},
+            {"message": "b", "seq": 2},
+            {"message": "c", "seq": 3},
+        ]
+    
+    async def frames():
+        response = await crawler_router.stream_job_logs("job")
+        return [frame async for frame in response.body_iterator]
+    
+    monkeypatch.setattr(crawler_router, "subscribe_to_logs", subscribe)
+    sent = asyncio.run(frames())
+    assert [frame.split("\n", 1)[0] for frame in sent] == [
+        'data: {"message": "a", "seq": 1}',
+        "event: lagged",
+        "event: batch",
+    ]
+    assert '"b"' in sent[2] and '"c"' in sent[2]
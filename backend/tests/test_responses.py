@@ -0,0 +1,35 @@
+"""
+Tests for the API response encoding
+"""
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import crawler as crawler_router
+from app.utils.responses import ORJSONFallbackResponse
+
+# Wider than 64 bits, so orjson refuses it
+BIG_ID = 123456789012345678901
+
+
+def test_fallback_response_renders_integers_beyond_64_bits():
+    response = ORJSONFallbackResponse({"id": BIG_ID, "name": "ünï"})
+    assert json.loads(response.body) == {"id": BIG_ID, "name": "ünï"}
+
+
+def test_validate_echoes_integers_beyond_64_bits(monkeypatch):
+    async def validate(curl_command):
+        return {
+            "is_valid": True,
+            "parsed_curl": None,
+            "test_response": {"data": [{"id": BIG_ID}]},
+            "detected_pagination": None,
+            "inferred_schema": {"id": "INTEGER"},
+            "error": None
+        }
+    
+    monkeypatch.setattr(crawler_router, "validate_curl_and_test", validate)
+    response = TestClient(app).post("/api/crawler/validate", json={"curl_command": "curl 'http://example.com'"})
+    assert response.status_code == 200
+    assert json.loads(response.content)["test_response"]["data"][0]["id"] == BIG_ID
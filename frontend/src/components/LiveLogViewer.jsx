@@ -48,6 +48,22 @@ function LiveLogViewer({ jobId, isOpen, onClose }) {
       }
     };
 
+    // Several logs coalesced into one frame
+    eventSource.addEventListener('batch', (event) => {
+      try {
+        const { batch } = JSON.parse(event.data);
+        const entries = (batch || []).filter(log => log.job_id);
+        setLogs(prev => [...prev, ...entries].slice(-500));
+      } catch (e) {
+        // Invalid data
+      }
+    });
+
+    // Stream dropped logs because we fell behind - reload from the database
+    eventSource.addEventListener('lagged', () => {
+      loadInitialLogs();
+    });
+
     eventSource.onerror = () => {
       setIsConnected(false);
     };